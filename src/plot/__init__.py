@@ -1,16 +1,35 @@
+import importlib
 
+# Name -> Modul. Jedes Plot-Modul lädt matplotlib bzw. pandas erst, wenn
+# seine Funktion gebraucht wird.
+_LAZY_ATTRIBUTES = {
+    "create_decoherence_plot": "plot.decoherence_curve_plot",
+    "calculate_average_waiting_times": "plot.waitingtime_average",
+    "create_waiting_time_plot": "plot.waitingtime_curve_plot",
+    "create_pumping_probability_plot": "plot.pumping_probability_curve_plot",
+    "create_waiting_time_sensitivity_plot": "plot.waiting_time_curve_plot",
+    "load_summary": "plot.results_loader",
+}
 
+__all__ = ["main", *_LAZY_ATTRIBUTES]
 
 
+def __getattr__(name: str):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
 
-
-from plot.decoherence_curve_plot import create_decoherence_plot
-from plot.waitingtime_average import calculate_average_waiting_times
-from plot.waitingtime_curve_plot import create_waiting_time_plot
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
 
 
 def main() -> None:
+    from plot.decoherence_curve_plot import create_decoherence_plot
+
     # plot_more()
     create_decoherence_plot()
     # create_waiting_time_plot()
@@ -1,34 +1,21 @@
-from pathlib import Path
-
 import matplotlib.pyplot as plt
-import pandas as pd
 
+from plot.results_loader import aggregate, load_summary
 from purify.my_constants import LAMBDA_1, LAMBDA_2, LAMBDA_3
-from purify.utils.path_util import path_from_lambdas
 
 
 def create_decoherence_plot():
     """
     Erstellt ein Diagramm, das die Fidelity gegen die Decoherence Time aufträgt,
-    basierend auf einer einzigen, zusammengeführten CSV-Datei.
+    basierend auf der Zusammenfassung der Ergebnisdatei.
     """
-
-    results_file = Path(path_from_lambdas())
-
-    if not results_file.exists():
-        print(f"Fehler: Die Datei '{results_file}' wurde nicht gefunden.")
-        return
-
     try:
-        # Nur einmal die gesamte Datei einlesen
-        df = pd.read_csv(results_file)
+        summary = load_summary()
+        if summary is None:
+            return
 
         # 1. Daten aggregieren: Durchschnittliche Fidelity pro Protokoll und Decoherence Time
-        plot_df = (
-            df.groupby(["strategy", "decoherence_time"])["fidelity"]
-            .mean()
-            .reset_index()
-        )
+        plot_df = aggregate(summary, ["strategy", "decoherence_time"], "fidelity")
 
     except Exception as e:
         print(f"Fehler beim Lesen oder Verarbeiten der Datei: {e}")
@@ -1,31 +1,20 @@
-from pathlib import Path
 import matplotlib.pyplot as plt
-import pandas as pd
+
+from plot.results_loader import aggregate, load_summary
 from purify.my_constants import LAMBDA_1, LAMBDA_2, LAMBDA_3
 
 def create_pumping_probability_plot():
     """
     Erstellt ein Diagramm, das die Fidelity gegen die Pumping Probability aufträgt.
     """
-    # Dateiname basierend auf den Konstanten
-    file_name = f"results/ALL_RESULTS_{LAMBDA_1}_{LAMBDA_2}_{LAMBDA_3}.csv"
-    results_file = Path(file_name)
-
-    if not results_file.exists():
-        print(f"Fehler: Die Datei '{results_file}' wurde nicht gefunden.")
-        return
-
     try:
-        # Datei einlesen
-        df = pd.read_csv(results_file)
+        summary = load_summary()
+        if summary is None:
+            return
 
         # 1. Daten aggregieren: 
         # Gruppieren nach Strategy und PUMPING PROBABILITY (statt Decoherence Time)
-        plot_df = (
-            df.groupby(["strategy", "pumping_probability"])["fidelity"]
-            .mean()
-            .reset_index()
-        )
+        plot_df = aggregate(summary, ["strategy", "pumping_probability"], "fidelity")
 
     except Exception as e:
         print(f"Fehler beim Lesen oder Verarbeiten der Datei: {e}")
@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from purify.constants_tuple import ConstantsTuple
+from purify.utils.path_util import path_from_lambdas, summary_path_from_results_path
+
+# Spalten der Rohdaten, nach denen gruppiert wird, und ihre Typen
+PARAMETER_DTYPES = {
+    "strategy": "category",
+    "decoherence_time": "float64",
+    "pumping_probability": "float64",
+    "waiting_time_sensitivity": "float64",
+    "lambda_strategy": "category",
+    "memory_slots": "int64",
+    "queue_capacity": "int64",
+}
+VALUE_DTYPES = {"fidelity": "float32", "time": "float32"}
+VALUES = tuple(VALUE_DTYPES)
+
+CHUNK_SIZE = 1_000_000
+
+
+def _aggregate_chunk(chunk: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    # Summen in float64, damit sich über viele Chunks nichts aufsummiert
+    values = chunk[list(VALUES)].astype("float64")
+    for name in VALUES:
+        values[f"{name}_squares"] = values[name] ** 2
+    grouped = pd.concat([chunk[keys], values], axis=1).groupby(
+        keys, observed=True, sort=False
+    )
+    partial = grouped.sum()
+    partial["count"] = grouped.size()
+    return partial
+
+
+def build_summary(
+    results_file: str | Path, chunk_size: int = CHUNK_SIZE
+) -> pd.DataFrame:
+    """
+    Liest die Rohdaten blockweise, nur mit den benötigten Spalten, und gibt
+    pro Parameterkombination Anzahl, Mittelwert und Varianz von Fidelity und
+    Wartezeit zurück. Spalten, die eine ältere Ergebnisdatei nicht hat (z.B.
+    memory_slots), werden mit dem Standardwert der ConstantsTuple ergänzt.
+    """
+    header = pd.read_csv(results_file, nrows=0).columns
+    keys = [name for name in PARAMETER_DTYPES if name in header]
+    columns = keys + list(VALUES)
+    dtypes = {
+        name: PARAMETER_DTYPES.get(name) or VALUE_DTYPES[name] for name in columns
+    }
+
+    partials = [
+        _aggregate_chunk(chunk, keys)
+        for chunk in pd.read_csv(
+            results_file, usecols=columns, dtype=dtypes, chunksize=chunk_size
+        )
+    ]
+    if not partials:
+        return pd.DataFrame(columns=[*keys, "count"])
+
+    totals = pd.concat(partials).groupby(level=keys, observed=True).sum()
+    count = totals["count"]
+    summary = pd.DataFrame({"count": count})
+    for name in VALUES:
+        mean = totals[name] / count
+        # Stichprobenvarianz aus Summe und Quadratsumme
+        variance = (totals[f"{name}_squares"] - count * mean**2) / (count - 1)
+        summary[f"{name}_mean"] = mean
+        summary[f"{name}_variance"] = variance.where(count > 1, np.nan).clip(lower=0)
+    return _complete(summary.reset_index())
+
+
+def _complete(summary: pd.DataFrame) -> pd.DataFrame:
+    """Ergänzt fehlende Parameter mit dem Standardwert der ConstantsTuple."""
+    for name, default in ConstantsTuple._field_defaults.items():
+        if name not in summary:
+            summary[name] = default
+    summary["strategy"] = summary["strategy"].astype("category")
+    return summary
+
+
+def read_summary(summary_file: str | Path) -> pd.DataFrame:
+    """
+    Liest eine Zusammenfassung im Format von ResultsAggregator.write_summary_csv
+    (eine Zeile pro Parameterkombination mit count, *_mean, *_variance).
+    """
+    header = pd.read_csv(summary_file, nrows=0).columns
+    dtypes = {name: dtype for name, dtype in PARAMETER_DTYPES.items() if name in header}
+    return _complete(pd.read_csv(summary_file, dtype=dtypes))
+
+
+def load_summary(
+    results_file: str | Path | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    refresh: bool = False,
+) -> pd.DataFrame | None:
+    """
+    Zusammenfassung der Ergebnisdatei (Standard: path_from_lambdas()). Gelesen
+    wird die SUMMARY_*.csv, die purify neben die Rohdaten schreibt (mit
+    --no-raw-results die einzige Datei). Aus den Rohdaten wird sie nur neu
+    berechnet und dorthin geschrieben, wenn sie fehlt, älter als die Rohdaten
+    ist oder `refresh` gesetzt ist. Gibt None zurück, wenn beide Dateien
+    fehlen.
+    """
+    if results_file is None:
+        results_file = path_from_lambdas()
+    results_file = Path(results_file)
+    summary_file = summary_path_from_results_path(results_file)
+    if not results_file.exists():
+        if not summary_file.exists():
+            print(
+                f"Fehler: Weder '{results_file}' noch '{summary_file}' wurde gefunden."
+            )
+            return None
+        return read_summary(summary_file)
+
+    if (
+        not refresh
+        and summary_file.exists()
+        and summary_file.stat().st_mtime >= results_file.stat().st_mtime
+    ):
+        return read_summary(summary_file)
+
+    summary = build_summary(results_file, chunk_size)
+    summary.to_csv(summary_file, index=False)
+    return summary
+
+
+def aggregate(summary: pd.DataFrame, keys: list[str], value: str) -> pd.DataFrame:
+    """
+    Mittelwert von `value` ("fidelity" oder "time") pro `keys`, über alle
+    anderen Parameter hinweg nach Anzahl gewichtet, also derselbe Wert wie
+    groupby(keys)[value].mean() auf den Rohdaten.
+    """
+    weighted = summary[f"{value}_mean"] * summary["count"]
+    grouped = (
+        summary.assign(_weighted=weighted)
+        .groupby(keys, observed=True)[["_weighted", "count"]]
+        .sum()
+    )
+    return (grouped["_weighted"] / grouped["count"]).rename(value).reset_index()
@@ -1,43 +1,44 @@
 import pandas as pd
 from pathlib import Path
 
+from plot.results_loader import aggregate, load_summary
+from purify.utils.path_util import lambdas_from_path
+
 def calculate_average_waiting_times():
-    # Pfad zum Ordner mit den Ergebnissen
-    results_dir = Path("results")
-    
-    if not results_dir.exists():
-        print("Ordner 'results' nicht gefunden.")
-        return
+    # Ergebnisdateien liegen dort, wo purify sie schreibt (path_from_lambdas)
+    results_dir = Path(".")
 
     summary_data = []
 
-    # Suche alle CSV-Dateien, die mit ALL_RESULTS beginnen
-    files = list(results_dir.glob("ALL_RESULTS_*.csv"))
+    # Suche alle Ergebnisdateien; nach --no-raw-results gibt es nur SUMMARY_*
+    files = sorted(
+        {
+            path.with_name(path.name.replace("SUMMARY_", "ALL_RESULTS_", 1))
+            for pattern in ("ALL_RESULTS_*.csv", "SUMMARY_*.csv")
+            for path in results_dir.glob(pattern)
+        }
+    )
     
     print(f"{len(files)} Dateien gefunden. Verarbeite...\n")
 
     for file_path in files:
         try:
             # 1. Lambda-Werte aus dem Dateinamen extrahieren
-            # Dateiname ist z.B. "ALL_RESULTS_00_02_00.csv" oder "ALL_RESULTS_0.2_0.0_0.0.csv"
-            parts = file_path.stem.split('_') 
-            
-            # Wir erwarten, dass die letzten 3 Teile die Lambda-Werte sind
-            # (Index 2, 3, 4 nach 'ALL' und 'RESULTS')
-            if len(parts) >= 5:
-                l1 = float(parts[2])
-                l2 = float(parts[3])
-                l3 = float(parts[4])
-            else:
+            # Dateiname ist z.B. "ALL_RESULTS_00_02_01.csv" (siehe path_from_lambdas)
+            lambdas = lambdas_from_path(file_path)
+            if lambdas is None:
                 print(f"Warnung: Konnte Lambda-Werte aus '{file_path.name}' nicht lesen.")
                 continue
+            l1, l2, l3 = lambdas
 
-            # 2. Datei einlesen
-            df = pd.read_csv(file_path)
+            # 2. Zusammenfassung laden (nur beim ersten Mal aus den Rohdaten)
+            summary = load_summary(file_path)
+            if summary is None:
+                continue
 
             # 3. Durchschnittliche Time pro Strategy berechnen
             # Wir gruppieren nur nach Strategy (über alle Decoherence Times hinweg)
-            avg_times = df.groupby("strategy")["time"].mean().reset_index()
+            avg_times = aggregate(summary, ["strategy"], "time")
 
             # 4. Lambda-Werte hinzufügen
             avg_times["Lambda_1"] = l1
@@ -1,32 +1,22 @@
-from pathlib import Path
 import matplotlib.pyplot as plt
-import pandas as pd
+
+from plot.results_loader import aggregate, load_summary
 from purify.my_constants import LAMBDA_1, LAMBDA_2, LAMBDA_3
 
 def create_waiting_time_plot():
     """
     Erstellt ein Diagramm, das die Waiting Time gegen die Decoherence Time aufträgt.
     """
-    # Dateiname dynamisch generieren
-    file_name = f"results/ALL_RESULTS_{LAMBDA_1}_{LAMBDA_2}_{LAMBDA_3}.csv"
-    results_file = Path(file_name)
-
-    if not results_file.exists():
-        print(f"Fehler: Die Datei '{results_file}' wurde nicht gefunden.")
-        return
-
     try:
-        df = pd.read_csv(results_file)
+        summary = load_summary()
+        if summary is None:
+            return
 
         # ---------------------------------------------------------
         # ÄNDERUNG 1: Wir aggregieren jetzt die Spalte "time"   
         # statt "fidelity".
         # ---------------------------------------------------------
-        plot_df = (
-            df.groupby(["strategy", "decoherence_time"])["time"]
-            .mean()
-            .reset_index()
-        )
+        plot_df = aggregate(summary, ["strategy", "decoherence_time"], "time")
         
         # Optional: Werte in der Konsole ausgeben zur Kontrolle
         print("Durchschnittliche Wartezeiten pro Strategie:")
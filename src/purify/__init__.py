@@ -1,40 +1,135 @@
-from purify.utils.path_util import path_from_lambdas
-from purify.my_constants import LAMBDA_STRAT
+import argparse
+import importlib
 import logging
 import math
 import os
 
-import numpy as np
-
 from purify.constants_tuple import ConstantsTuple
 from purify.my_constants import (
-    DECOHERENCE_TIMES,
+    ENTANGLEMENT_GENERATION_COUNT,
     ETA,
     LAMBDA_1,
     LAMBDA_2,
     LAMBDA_3,
     LENGTH,
     P_G,
-    PUMPING_PROBABILTIES,
-    STRATEGIES,
-    WAITING_TIME_SENSIVITIES,
+    RESULT_CACHE_DIR,
 )
-from purify.my_simulation import Simulation
 
 logger = logging.getLogger(__name__)
-rng = np.random.default_rng()
+
+# Name -> Modul. Diese Namen werden erst beim ersten Zugriff importiert, damit
+# `import purify` (und jeder Worker-Prozess) nicht NumPy und die ganze
+# Simulation laden muss.
+_LAZY_ATTRIBUTES = {
+    "Simulation": "purify.my_simulation",
+    "ResultsAggregator": "purify.statistics",
+    "run_sweep": "purify.sweep",
+    "sweep_constants": "purify.sweep",
+    "ResultsWriter": "purify.utils.csv_utils",
+    "path_from_lambdas": "purify.utils.path_util",
+    "summary_path_from_lambdas": "purify.utils.path_util",
+}
+
+__all__ = ["ConstantsTuple", "main", *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
 
 
 def main() -> None:
-    # parser = argparse.ArgumentParser()
-    # parser.add_argument(
-    #     "--strategy",
-    #     type=int,
-    #     choices=range(1, len(Strategy) + 1),
-    #     required=True,
-    # )
-    # args = parser.parse_args()
-    # strategy = Strategy(args.strategy)
+    from purify.statistics import ResultsAggregator
+    from purify.sweep import run_sweep, sweep_constants
+    from purify.utils.csv_utils import ResultsWriter
+    from purify.utils.path_util import path_from_lambdas, summary_path_from_lambdas
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Anzahl paralleler Prozesse (Standard: alle CPU-Kerne)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Basis-Seed, aus dem die Seeds der einzelnen Aufgaben abgeleitet werden",
+    )
+    parser.add_argument(
+        "--skip-failed-generations",
+        action="store_true",
+        help="Fehlgeschlagene Erzeugungsversuche geometrisch überspringen",
+    )
+    parser.add_argument(
+        "--fidelity-half-width",
+        type=float,
+        default=None,
+        help="Abbruch, sobald das 95%%-Konfidenzintervall der Fidelity so schmal ist",
+    )
+    parser.add_argument(
+        "--waiting-time-half-width",
+        type=float,
+        default=None,
+        help="zusätzliche Zielgenauigkeit für die mittlere Wartezeit in s",
+    )
+    parser.add_argument("--min-generations", type=int, default=10000)
+    parser.add_argument(
+        "--max-generations", type=int, default=ENTANGLEMENT_GENERATION_COUNT
+    )
+    parser.add_argument(
+        "--common-random-numbers",
+        action="store_true",
+        help="eine gemeinsame Zeitachse für alle Parameterkombinationen",
+    )
+    parser.add_argument(
+        "--purification-table",
+        action="store_true",
+        help="Pump-Funktionen tabellieren (nur USE_CONSTANTS)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=RESULT_CACHE_DIR,
+        help="Ergebnisse pro Parameterkombination hier ablegen und wiederverwenden "
+        "(nur zusammen mit --seed aktiv)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache_dir",
+        action="store_const",
+        const=None,
+        help="jede Parameterkombination neu simulieren",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="CSV",
+        help="Zeit pro Phase und Zähler pro Parameterkombination in diese Datei",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="DIR",
+        help="Ereignis-Records (Tracer) pro Parameterkombination als .npy in "
+        "dieses Verzeichnis",
+    )
+    parser.add_argument(
+        "--no-raw-results",
+        dest="raw_results",
+        action="store_false",
+        help="Keine Zeile pro Anfrage schreiben, nur die Zusammenfassung",
+    )
+    args = parser.parse_args()
 
     logging.basicConfig(
         filename="myapp.log",
@@ -51,26 +146,33 @@ def main() -> None:
     except Exception as e:
         print(f"Ein unerwarteter Fehler ist aufgetreten: {e}")
 
-    for strategy in STRATEGIES:
-        logger.warning(f"Starting Strategy {strategy}")
-        for decoherence_time in DECOHERENCE_TIMES:
-            logger.warning(f"Starting decoherence time {decoherence_time}")
-            for pumping_probabily in PUMPING_PROBABILTIES:
-                logger.warning(f"Starting Pumping Probability {pumping_probabily}")
-                for waiting_time_sensitivity in WAITING_TIME_SENSIVITIES:
-                    logger.warning(
-                        f"Starting Waiting time sensitivity: {waiting_time_sensitivity}"
-                    )
-                    for lambda_strat in LAMBDA_STRAT:
-                        logger.warning(
-                        f"Starting Lambda Strategy: {lambda_strat}"
-                    )
-                        constant_tuple = ConstantsTuple(
-                            strategy=strategy,
-                            decoherence_time=decoherence_time,
-                            pumping_probability=pumping_probabily,
-                            waiting_time_sensitivity=waiting_time_sensitivity,
-                            lambda_strategy=lambda_strat,
-                        )
-                        sim = Simulation(constant_tuple)
-                        sim.run()
+    aggregator = ResultsAggregator()
+    results_writer = ResultsWriter() if args.raw_results else None
+
+    def write_result(fidelity, time, constants):
+        aggregator.write(fidelity, time, constants)
+        if results_writer is not None:
+            results_writer.write(fidelity, time, constants)
+
+    try:
+        run_sweep(
+            sweep_constants(),
+            workers=args.workers,
+            seed=args.seed,
+            write_result=write_result,
+            common_random_numbers=args.common_random_numbers,
+            cache_dir=args.cache_dir,
+            profile_path=args.profile,
+            trace_dir=args.trace,
+            skip_failed_generations=args.skip_failed_generations,
+            fidelity_half_width=args.fidelity_half_width,
+            waiting_time_half_width=args.waiting_time_half_width,
+            min_generations=args.min_generations,
+            max_generations=args.max_generations,
+            purification_table=args.purification_table,
+        )
+    finally:
+        if results_writer is not None:
+            results_writer.close()
+
+    aggregator.write_summary_csv(summary_path_from_lambdas())
@@ -0,0 +1,439 @@
+import argparse
+import logging
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from purify.constants_tuple import ConstantsTuple
+from purify.entanglement import EntanglementState
+from purify.my_constants import (
+    DELTA_T,
+    LAMBDA_1,
+    LAMBDA_2,
+    LAMBDA_3,
+    P_G,
+    QUBIT_ARRIVAL_SCALE,
+)
+from purify.my_enums import LambdaSrategy, Strategy
+from purify.qubit import teleportation_fidelity
+from purify.utils.purification_util import Purification
+
+logger = logging.getLogger(__name__)
+
+"""
+Markov-Modell des Einzelknotens aus Node, diskretisiert in Zeitschlitze der
+Länge DELTA_T (ein Erzeugungsversuch pro Schlitz):
+
+- good memory: leer oder Fidelity F. F wird auf einem Gitter in
+  x = log(F - 1/4) gehalten; Dekohärenz verschiebt x pro Schlitz um genau
+  DELTA_T / t_c, also um eine ganze Zahl von Zellen (keine numerische
+  Diffusion). Ist das weniger als eine Zelle (große t_c), rückt pro Schlitz
+  nur ein Anteil der Wahrscheinlichkeit eine Zelle weiter, so dass der
+  Erwartungswert von F - 1/4 exakt zerfällt; sonst bräuchte das Gitter
+  t_c / DELTA_T Zellen pro e-Faltung. Das Ergebnis des Pumpens wird auf das
+  Gitter interpoliert.
+- queue: leer oder Alter der wartenden Anfrage in Schlitzen. Eine Anfrage
+  wartet nur, wenn good memory leer ist, sonst wird sie sofort bedient.
+- Ankünfte: Gamma(2)-Zwischenankunftszeiten = Erlang-2, also zwei
+  exponentielle Phasen mit Rate QUBIT_ARRIVAL_SCALE.
+
+Ankünfte liegen gleichverteilt in einem Schlitz, der Erzeugungsversuch an
+seinem Ende. bad memory wird nicht gebraucht: bei USE_CONSTANTS ist ein neues
+Paar immer besser als das gealterte in good memory (ALWAYS_REPLACE ersetzt
+also immer good memory) und die Pump-Strategien leeren bad memory stets.
+"""
+
+# Paare mit F - 1/4 unterhalb dieser Schwelle werden als vollständig
+# depolarisiert behandelt
+FIDELITY_FLOOR = 1e-6
+
+
+class AnalyticResult(NamedTuple):
+    constants: ConstantsTuple
+    fidelity: float
+    waiting_time: float
+    # Anteil der Anfragen, die bedient (nicht verworfen) werden
+    served_fraction: float
+    # |Ergebnis auf feinem - Ergebnis auf grobem Gitter|, das feine Gitter
+    # hat stets halb so breite Zellen
+    fidelity_error: float
+    waiting_time_error: float
+    cells: int
+    iterations: int
+
+
+class _Grid:
+    """
+    Gitter in x = log(F - 1/4). Pro Schlitz rückt die Wahrscheinlichkeit um
+    `shift` Zellen, der Anteil `spill` davon um eine weitere. Mit `refinement`
+    wird jede Zelle in so viele gleich breite Zellen geteilt.
+    """
+
+    def __init__(
+        self,
+        decoherence_time: float,
+        fresh_fidelity: float,
+        cell_width: float,
+        refinement: int = 1,
+    ):
+        decay_per_slot = DELTA_T / decoherence_time
+        if decay_per_slot >= cell_width:
+            # ganze Zahl von Zellen pro Schlitz; vor der Verfeinerung
+            # gerundet, damit das feine Gitter das grobe wirklich teilt
+            self.shift = math.ceil(decay_per_slot / cell_width) * refinement
+            self.width = decay_per_slot / self.shift
+            self.spill = 0.0
+        else:
+            self.width = cell_width / refinement
+            cells_per_slot = decay_per_slot / self.width
+            self.shift = math.floor(cells_per_slot)
+            # (1 - spill) e^(-shift w) + spill e^(-(shift + 1) w) = e^(-decay)
+            self.spill = -math.expm1(
+                -(cells_per_slot - self.shift) * self.width
+            ) / -math.expm1(-self.width)
+
+        x_fresh = math.log(fresh_fidelity - 0.25)
+        # Zellen oberhalb des frischen Paares (gepumpte Paare bis F = 1)
+        self.fresh_index = max(0, math.ceil((math.log(0.75) - x_fresh) / self.width))
+        below = math.ceil((x_fresh - math.log(FIDELITY_FLOOR)) / self.width)
+        self.size = self.fresh_index + below + 1
+
+        self.top = x_fresh + self.fresh_index * self.width
+        self.x = self.top - self.width * np.arange(self.size)
+        self.fidelity = 0.25 + np.exp(self.x)
+
+    def position(self, fidelity: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Untere Zelle und Gewicht der oberen Nachbarzelle für beliebige F."""
+        x = np.log(np.maximum(fidelity - 0.25, FIDELITY_FLOOR))
+        position = np.clip((self.top - x) / self.width, 0, self.size - 1)
+        lower = np.minimum(np.floor(position).astype(np.int64), self.size - 2)
+        weight = position - lower
+        # Gewicht gehört zu `lower + 1` (kleinere Fidelity)
+        return lower, weight
+
+
+def _shift(g: np.ndarray, cells: int, weight: float) -> np.ndarray:
+    """`weight * g` um `cells` Zellen zu kleinerer Fidelity verschoben; was
+    über das Gitterende hinausliefe, bleibt in der letzten Zelle."""
+    size = g.shape[1]
+    shifted = np.zeros_like(g)
+    shifted[:, cells:] = weight * g[:, : size - cells]
+    shifted[:, -1] += weight * g[:, size - cells :].sum(axis=1)
+    return shifted
+
+
+def _fresh_state(
+    lambdas: tuple[float, float, float] | None = None,
+) -> EntanglementState:
+    lambda_1, lambda_2, lambda_3 = (
+        lambdas if lambdas is not None else (LAMBDA_1, LAMBDA_2, LAMBDA_3)
+    )
+    fresh = EntanglementState(
+        1.0 - (lambda_1 + lambda_2 + lambda_3), lambda_1, lambda_2, lambda_3
+    )
+    if fresh.fidelity - 0.25 <= FIDELITY_FLOOR:
+        raise ValueError(f"Fresh pairs must have F > 1/4, got {fresh.fidelity}")
+    return fresh
+
+
+def _pump_functions(strategy: Strategy):
+    match strategy:
+        case Strategy.ALWAYS_PROT_1 | Strategy.ALWAYS_PROT_1_WITH_PROBABILITY:
+            return (
+                Purification.prot_1_success_probability,
+                Purification.prot_1_jump_function,
+            )
+        case Strategy.ALWAYS_PROT_2 | Strategy.ALWAYS_PROT_2_WITH_PROBABILITY:
+            return (
+                Purification.prot_2_success_probability,
+                Purification.prot_2_jump_function,
+            )
+        case Strategy.ALWAYS_PROT_3 | Strategy.ALWAYS_PROT_3_WITH_PROBABILITY:
+            return (
+                Purification.prot_3_success_probability,
+                Purification.prot_3_jump_function,
+            )
+        case Strategy.ALWAYS_PMD:
+            return (
+                Purification.pmd_success_probability,
+                Purification.pmd_jump_function,
+            )
+    return None
+
+
+def _solve_on_grid(
+    constants: ConstantsTuple,
+    cell_width: float,
+    tolerance: float,
+    max_iterations: int,
+    lambdas: tuple[float, float, float] | None = None,
+    refinement: int = 1,
+):
+    tc = constants.decoherence_time
+    fresh = _fresh_state(lambdas)
+    grid = _Grid(tc, fresh.fidelity, cell_width, refinement)
+    cells = grid.size
+
+    # Erlang-2-Ankünfte: Wahrscheinlichkeiten pro Schlitz je Phase
+    rate = QUBIT_ARRIVAL_SCALE * DELTA_T
+    stay = math.exp(-rate)
+    advance = rate * math.exp(-rate)
+    arrival = np.array([1.0 - stay - advance, 1.0 - stay])
+
+    # Wartezeit-Alter bis die Restwahrscheinlichkeit vernachlässigbar ist
+    ages = math.ceil(math.log(1e-14) / math.log(1 - P_G)) if P_G < 1 else 1
+    # Die Ankunft ist gleichverteilt im Schlitz. Über die Lage wird mit
+    # Gauß-Legendre gemittelt, bei sofortiger Bedienung (F_q = 1) ist die
+    # Teleportations-Fidelity linear in F und der Mittelwert exakt.
+    nodes, weights = np.polynomial.legendre.leggauss(8)
+    nodes, weights = (nodes + 1) / 2, weights / 2
+    waiting_times = (np.arange(ages) + 0.5) * DELTA_T
+    qubit_fidelity = (
+        np.exp(
+            -(np.arange(ages)[:, None] + nodes) * DELTA_T
+            * constants.waiting_time_sensitivity
+            / tc
+        )
+        + 2.0
+    ) / 3.0
+    queue_served_fidelity = teleportation_fidelity(
+        fresh.fidelity, qubit_fidelity
+    ) @ weights
+
+    decay = DELTA_T / tc
+    mean_decay = -math.expm1(-decay) / decay
+    arrival_served_fidelity = teleportation_fidelity(
+        0.25 + (grid.fidelity - 0.25) * mean_decay, 1.0
+    )
+
+    # Verhalten bei erfolgreicher Erzeugung und belegter good memory
+    pump = _pump_functions(constants.strategy)
+    pumping_probability = 1.0
+    if constants.strategy in (
+        Strategy.ALWAYS_PROT_1_WITH_PROBABILITY,
+        Strategy.ALWAYS_PROT_2_WITH_PROBABILITY,
+        Strategy.ALWAYS_PROT_3_WITH_PROBABILITY,
+    ):
+        pumping_probability = constants.pumping_probability
+    if pump is not None:
+        # die lambdas von good memory gehen nicht ein (Werner-Zustand)
+        zeros = np.zeros(cells)
+        good = EntanglementState(grid.fidelity, zeros, zeros, zeros)
+        success_probability = np.clip(pump[0](good, fresh), 0.0, 1.0)
+        target_lower, target_weight = grid.position(pump[1](good, fresh))
+
+    # Verteilung: e = leer, g = good memory (Zelle), q = Anfrage (Alter)
+    e = np.array([1.0, 0.0])
+    g = np.zeros((2, cells))
+    q = np.zeros((2, ages))
+
+    def slot(e, g, q, measure: bool = False):
+        # 1. Ankunft innerhalb des Schlitzes
+        arrived_g = arrival[0] * g[0] + arrival[1] * g[1]
+        arrived_e = arrival[0] * e[0] + arrival[1] * e[1]
+        arrived_q = arrival[0] * q[0] + arrival[1] * q[1]
+
+        g = np.stack([stay * g[0], advance * g[0] + stay * g[1]])
+        e = np.array(
+            [stay * e[0] + arrived_g.sum(), advance * e[0] + stay * e[1]]
+        )
+        q = np.stack([stay * q[0] + arrived_q, advance * q[0] + stay * q[1]])
+        q[0, 0] += arrived_e
+
+        # 2. Dekohärenz über einen ganzen Schlitz
+        shifted = _shift(g, grid.shift, 1.0 - grid.spill)
+        if grid.spill:
+            shifted += _shift(g, grid.shift + 1, grid.spill)
+        g = shifted
+
+        # 3. Erzeugungsversuch am Ende des Schlitzes
+        served_from_queue = P_G * q
+        new_e = (1 - P_G) * e + served_from_queue.sum(axis=1)
+        new_g = (1 - P_G) * g
+        new_g[:, grid.fresh_index] += P_G * e
+
+        new_q = np.zeros_like(q)
+        new_q[:, 1:] = (1 - P_G) * q[:, :-1]
+        new_q[:, -1] += (1 - P_G) * q[:, -1]
+
+        generated = P_G * g
+        if constants.strategy == Strategy.ALWAYS_REPLACE:
+            new_g[:, grid.fresh_index] += generated.sum(axis=1)
+        elif pump is None:
+            # Node ignoriert das neue Paar
+            new_g += generated
+        else:
+            pumped = pumping_probability * generated
+            new_g += generated - pumped
+            succeeded = pumped * success_probability
+            new_e += (pumped - succeeded).sum(axis=1)
+            for phase in range(2):
+                new_g[phase] += np.bincount(
+                    target_lower,
+                    weights=succeeded[phase] * (1 - target_weight),
+                    minlength=cells,
+                )
+                new_g[phase] += np.bincount(
+                    target_lower + 1,
+                    weights=succeeded[phase] * target_weight,
+                    minlength=cells,
+                )
+
+        if not measure:
+            return new_e, new_g, new_q
+
+        served_queue = served_from_queue.sum(axis=0)
+        served = arrived_g.sum() + served_queue.sum()
+        fidelity_sum = (arrived_g * arrival_served_fidelity).sum() + (
+            served_queue * queue_served_fidelity
+        ).sum()
+        waiting_sum = (served_queue * waiting_times).sum()
+        arrivals = arrived_g.sum() + arrived_e + arrived_q.sum()
+        return served, fidelity_sum, waiting_sum, arrivals
+
+    iterations = 0
+    while iterations < max_iterations:
+        # Konvergenz nur alle 100 Schlitze prüfen
+        for _ in range(99):
+            e, g, q = slot(e, g, q)
+        e_next, g_next, q_next = slot(e, g, q)
+        iterations += 100
+        difference = (
+            np.abs(e_next - e).sum()
+            + np.abs(g_next - g).sum()
+            + np.abs(q_next - q).sum()
+        )
+        e, g, q = e_next, g_next, q_next
+        if difference < tolerance:
+            break
+    else:
+        logger.warning(
+            f"{constants}: no stationary distribution after {iterations} iterations"
+        )
+
+    served, fidelity_sum, waiting_sum, arrivals = slot(e, g, q, measure=True)
+    return (
+        fidelity_sum / served,
+        waiting_sum / served,
+        served / arrivals,
+        cells,
+        iterations,
+    )
+
+
+def solve(
+    constants: ConstantsTuple,
+    cell_width: float = 0.01,
+    tolerance: float = 1e-12,
+    max_iterations: int = 1_000_000,
+    lambdas: tuple[float, float, float] | None = None,
+) -> AnalyticResult:
+    """
+    Erwartete Teleportations-Fidelity und Wartezeit der bedienten Anfragen im
+    stationären Zustand. `cell_width` ist die maximale Zellbreite in
+    e-Faltungen von F - 1/4. Gerechnet wird auf einem Gitter mit halb so
+    breiten Zellen, die Differenz zum Ergebnis mit voller Zellbreite ist die
+    Fehlerschätzung. Ohne Pumpen (z.B. ALWAYS_REPLACE) gehen nur in F lineare
+    Größen ein, der Fehler ist dort exakt 0. `lambdas` ersetzt LAMBDA_1..3 für
+    neue Paare.
+
+    Aufwand: etwa 1 s pro Aufruf unabhängig von t_c, die ganze Kurve über
+    DECOHERENCE_TIMES also etwa 10 s pro Strategie.
+    """
+    if constants.lambda_strategy != LambdaSrategy.USE_CONSTANTS:
+        raise ValueError("The analytic solver only supports USE_CONSTANTS")
+    if constants.memory_slots != 2 or constants.queue_capacity != 1:
+        raise ValueError(
+            "The analytic solver only supports two memory slots "
+            "and a single-request queue"
+        )
+
+    fine = _solve_on_grid(
+        constants, cell_width, tolerance, max_iterations, lambdas, refinement=2
+    )
+    coarse = _solve_on_grid(constants, cell_width, tolerance, max_iterations, lambdas)
+    return AnalyticResult(
+        constants=constants,
+        fidelity=float(fine[0]),
+        waiting_time=float(fine[1]),
+        served_fraction=float(fine[2]),
+        fidelity_error=float(abs(fine[0] - coarse[0])),
+        waiting_time_error=float(abs(fine[1] - coarse[1])),
+        cells=fine[3],
+        iterations=fine[4],
+    )
+
+
+class SimulatorComparison(NamedTuple):
+    analytic: AnalyticResult
+    simulated_fidelity: float
+    simulated_fidelity_half_width: float
+    simulated_waiting_time: float
+    simulated_waiting_time_half_width: float
+    # Abweichung in Einheiten des Standardfehlers der Simulation
+    fidelity_z_score: float
+
+
+def compare_with_simulation(
+    constants: ConstantsTuple,
+    generation_count: int = 3_000_000,
+    seed=None,
+    analytic: AnalyticResult | None = None,
+) -> SimulatorComparison:
+    """Vergleicht das Modell mit einer Simulation gleicher Parameter."""
+    from purify.my_simulation import Simulation
+
+    if analytic is None:
+        analytic = solve(constants)
+
+    sim = Simulation(
+        constants,
+        write_result=lambda *_: None,
+        seed=seed,
+        skip_failed_generations=True,
+        generation_count=generation_count,
+    )
+    result = sim.run_until_precision(0.0, min_generations=generation_count)
+    standard_error = result.fidelity_half_width / 1.959963984540054
+    return SimulatorComparison(
+        analytic=analytic,
+        simulated_fidelity=result.fidelity_mean,
+        simulated_fidelity_half_width=result.fidelity_half_width,
+        simulated_waiting_time=result.waiting_time_mean,
+        simulated_waiting_time_half_width=result.waiting_time_half_width,
+        fidelity_z_score=(analytic.fidelity - result.fidelity_mean) / standard_error,
+    )
+
+
+def main() -> None:
+    """Berechnet die Kurven für alle Parameterkombinationen aus my_constants."""
+    from purify.sweep import sweep_constants
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--compare",
+        type=int,
+        default=0,
+        metavar="GENERATIONS",
+        help="zusätzlich mit einer Simulation dieser Länge vergleichen",
+    )
+    args = parser.parse_args()
+
+    for constants in sweep_constants():
+        result = solve(constants)
+        line = (
+            f"{constants.strategy.name:<16} t_c={constants.decoherence_time:<8} "
+            f"F={result.fidelity:.4f} ± {result.fidelity_error:.1e} "
+            f"wait={result.waiting_time:.3e} s served={result.served_fraction:.3f}"
+        )
+        if args.compare:
+            comparison = compare_with_simulation(
+                constants, args.compare, analytic=result
+            )
+            line += (
+                f" | sim F={comparison.simulated_fidelity:.4f}"
+                f" ± {comparison.simulated_fidelity_half_width:.4f}"
+                f" z={comparison.fidelity_z_score:+.2f}"
+            )
+        print(line)
@@ -0,0 +1,426 @@
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from purify.batch_simulation import BatchSimulation
+from purify.chain_simulation import ChainSimulation
+from purify.constants_tuple import ConstantsTuple
+from purify.entanglement import Entanglement
+from purify.my_constants import ENTANGLEMENT_GENERATION_COUNT
+from purify.my_enums import LambdaSrategy, Strategy
+from purify.my_simulation import Simulation
+from purify.my_time import Time
+from purify.node import PUMPING_STRATEGIES
+from purify.qubit import Qubit
+from purify.statistics import ResultsAggregator
+from purify.sweep import run_sweep, sweep_constants
+from purify.utils.bernouli_util import bernouli_with_probability_is_successfull
+from purify.utils.csv_utils import write_results_csv
+from purify.utils.purification_util import Purification
+
+logger = logging.getLogger(__name__)
+
+SIMULATION_STRATEGIES = (Strategy.ALWAYS_REPLACE,) + tuple(PUMPING_STRATEGIES)
+# PMD verlangt lambda_2 = lambda_3 = 0; gleiche Fidelity wie die Standard-Lambdas
+PMD_LAMBDAS = (0.3, 0.0, 0.0)
+DECOHERENCE_TIME = 0.01
+SWEEP_GENERATION_COUNT = 30_000
+# relative Abweichung, ab der compare() eine Änderung meldet
+TOLERANCE = 0.05
+# Module, deren Importzeit gemessen wird; purify.sweep lädt jeder Worker
+IMPORT_MODULES = ("purify", "purify.sweep", "plot")
+WORKER_MODULE = "purify.sweep"
+# Budget für den Import eines Worker-Prozesses in ms
+WORKER_IMPORT_BUDGET = 250.0
+# Replikate, für die BatchSimulation gemessen wird
+BATCH_REPLICAS = (20, 200, 1000)
+# Links, für die ChainSimulation gemessen wird
+CHAIN_LINKS = (1, 10, 100, 300)
+
+
+class Measurement(NamedTuple):
+    value: float
+    unit: str
+    # True für Raten (events/s), False für Zeiten
+    higher_is_better: bool
+
+
+class Comparison(NamedTuple):
+    name: str
+    value: float
+    baseline: float
+    # > 1 heißt schneller als die Baseline
+    speedup: float
+    verdict: str
+
+
+def _best_of(function: Callable[[], None], number: int, repeat: int) -> float:
+    """Beste Zeit pro Aufruf in Sekunden."""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def benchmark_simulations(
+    generation_count: int = ENTANGLEMENT_GENERATION_COUNT,
+    repeat: int = 1,
+    seed: int = 0,
+) -> tuple[dict[str, Measurement], dict[str, str]]:
+    """
+    Ereignisse pro Sekunde von Simulation.run je Strategy und LambdaSrategy,
+    dazu der Grund für jede Kombination, die nicht laufen kann. ALWAYS_PMD
+    läuft mit PMD_LAMBDAS.
+    """
+    results, skipped = {}, {}
+    for lambda_strategy in LambdaSrategy:
+        for strategy in SIMULATION_STRATEGIES:
+            constants = ConstantsTuple(
+                strategy, DECOHERENCE_TIME, 1.0, 1, lambda_strategy
+            )
+            name = f"simulation/{strategy.name}/{lambda_strategy.name}"
+            rates = []
+            try:
+                for _ in range(repeat):
+                    sim = Simulation(
+                        constants,
+                        write_result=lambda *_: None,
+                        seed=seed,
+                        generation_count=generation_count,
+                        lambdas=(
+                            PMD_LAMBDAS if strategy == Strategy.ALWAYS_PMD else None
+                        ),
+                    )
+                    start = time.perf_counter()
+                    sim.run()
+                    elapsed = time.perf_counter() - start
+                    events = sim.time.entanglement_count + sim.time.request_count
+                    rates.append(events / elapsed)
+            except Exception as e:
+                # z.B. RANDOM_WITH_LARGEST_LAMBDA mit LAMBDA_1 = 0
+                skipped[name] = str(e)
+                continue
+            results[name] = Measurement(max(rates), "events/s", True)
+            logger.info(f"{name}: {max(rates):.0f} events/s")
+    return results, skipped
+
+
+def benchmark_batch_simulation(
+    generation_count: int = SWEEP_GENERATION_COUNT,
+    replicas: tuple[int, ...] = BATCH_REPLICAS,
+    seed: int = 0,
+) -> dict[str, Measurement]:
+    """
+    Ereignisse pro Sekunde über alle Replikate von BatchSimulation, vergleichbar
+    mit simulation/ALWAYS_REPLACE/USE_CONSTANTS aus benchmark_simulations.
+    """
+    constants = ConstantsTuple(
+        Strategy.ALWAYS_REPLACE, DECOHERENCE_TIME, 1.0, 1, LambdaSrategy.USE_CONSTANTS
+    )
+    results = {}
+    for count in replicas:
+        batch = BatchSimulation(constants, count, seed, generation_count)
+        start = time.perf_counter()
+        batch.run()
+        elapsed = time.perf_counter() - start
+        events = batch.entanglement_count.sum() + batch.request_count.sum()
+        results[f"batch_simulation/{count}"] = Measurement(
+            float(events / elapsed), "events/s", True
+        )
+    return results
+
+
+def benchmark_chain_simulation(
+    generation_count: int = SWEEP_GENERATION_COUNT,
+    links: tuple[int, ...] = CHAIN_LINKS,
+    seed: int = 0,
+) -> dict[str, Measurement]:
+    """
+    Erzeugungsversuche aller Links plus Anfragen pro Sekunde von
+    ChainSimulation mit ALWAYS_PROT_1, dem langsamsten Pfad (eine Runde pro
+    Erfolg). Sollte mit `links` steigen, sonst skaliert die Kette nicht.
+    """
+    constants = ConstantsTuple(
+        Strategy.ALWAYS_PROT_1, DECOHERENCE_TIME, 1.0, 1, LambdaSrategy.USE_CONSTANTS
+    )
+    results = {}
+    for count in links:
+        chain = ChainSimulation(
+            constants, count, seed, generation_count=generation_count
+        )
+        start = time.perf_counter()
+        chain.run()
+        elapsed = time.perf_counter() - start
+        events = count * chain.time.entanglement_count + chain.time.request_count
+        results[f"chain_simulation/{count}"] = Measurement(
+            events / elapsed, "events/s", True
+        )
+    return results
+
+
+def benchmark_functions(
+    number: int = 100_000, repeat: int = 5
+) -> dict[str, Measurement]:
+    """Laufzeit pro Aufruf der Funktionen im inneren Simulationspfad."""
+    clock = Time()
+    clock.current_time = 0.002
+    entanglement = Entanglement.from_default_lambdas(clock, DECOHERENCE_TIME)
+    entanglement.creationTime = 0.0
+    good = entanglement.snapshot()
+    bad = Entanglement.from_default_lambdas(clock, DECOHERENCE_TIME).snapshot()
+    pmd_bad = Entanglement.from_lambdas(
+        clock, DECOHERENCE_TIME, *PMD_LAMBDAS
+    ).snapshot()
+    qubit = Qubit(
+        clock,
+        ConstantsTuple(
+            Strategy.ALWAYS_REPLACE,
+            DECOHERENCE_TIME,
+            1.0,
+            1,
+            LambdaSrategy.USE_CONSTANTS,
+        ),
+    )
+    qubit.creationTime = 0.0
+
+    functions: dict[str, Callable[[], object]] = {
+        f"purification/{name}": (
+            lambda function=getattr(Purification, name): function(good, bad)
+        )
+        for name in (
+            "prot_1_success_probability",
+            "prot_1_jump_function",
+            "prot_2_success_probability",
+            "prot_2_jump_function",
+            "prot_3_success_probability",
+            "prot_3_jump_function",
+        )
+    }
+    functions.update(
+        {
+            f"purification/{name}": (
+                lambda function=getattr(Purification, name): function(good, pmd_bad)
+            )
+            for name in ("pmd_success_probability", "pmd_jump_function")
+        }
+    )
+    functions.update(
+        {
+            "entanglement/get_current_fidelity": entanglement.get_current_fidelity,
+            "entanglement/get_current_lambda_1": entanglement.get_current_lambda_1,
+            "entanglement/snapshot": entanglement.snapshot,
+            "qubit/teleportation_fidelity": lambda: qubit.teleportation_fidelity(0.8),
+            "bernouli_with_probability_is_successfull": lambda: (
+                bernouli_with_probability_is_successfull(0.3)
+            ),
+        }
+    )
+
+    results = {}
+    for name, function in functions.items():
+        seconds = _best_of(function, number, repeat)
+        results[name] = Measurement(seconds * 1e9, "ns/call", False)
+    return results
+
+
+def benchmark_write_results_csv(number: int = 2000, repeat: int = 3) -> Measurement:
+    """write_results_csv öffnet die Datei pro Zeile; gemessen in einem
+    temporären Verzeichnis."""
+    constants = ConstantsTuple(
+        Strategy.ALWAYS_REPLACE, DECOHERENCE_TIME, 1.0, 1, LambdaSrategy.USE_CONSTANTS
+    )
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            seconds = _best_of(
+                lambda: write_results_csv(0.8, 1e-4, constants), number, repeat
+            )
+        finally:
+            os.chdir(cwd)
+    return Measurement(seconds * 1e9, "ns/call", False)
+
+
+def benchmark_import(module: str, repeat: int = 5) -> Measurement:
+    """Importzeit von `module` in einem frischen Interpreter, abzüglich des
+    Interpreter-Starts."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    def run(code: str) -> float:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+        return time.perf_counter() - start
+
+    startup = min(run("pass") for _ in range(repeat))
+    seconds = min(run(f"import {module}") for _ in range(repeat))
+    return Measurement(max(seconds - startup, 0.0) * 1e3, "ms", False)
+
+
+def worker_import_within_budget(current: dict) -> bool:
+    measurement = current["results"].get(f"import/{WORKER_MODULE}")
+    return measurement is None or measurement["value"] <= WORKER_IMPORT_BUDGET
+
+
+def benchmark_sweep(
+    generation_count: int = SWEEP_GENERATION_COUNT, workers: int = 1, seed: int = 0
+) -> Measurement:
+    """Wall-Clock des kompletten Sweeps aus my_constants mit weniger Versuchen."""
+    aggregator = ResultsAggregator()
+    # ohne die "Finished ..."-Warnung pro Punkt; Worker übernehmen das Level
+    purify_logger = logging.getLogger("purify")
+    level = purify_logger.level
+    purify_logger.setLevel(logging.ERROR)
+    start = time.perf_counter()
+    try:
+        run_sweep(
+            sweep_constants(),
+            workers=workers,
+            seed=seed,
+            write_result=aggregator.write,
+            max_generations=generation_count,
+        )
+    finally:
+        purify_logger.setLevel(level)
+    return Measurement(time.perf_counter() - start, "s", False)
+
+
+def run_benchmarks(
+    generation_count: int = ENTANGLEMENT_GENERATION_COUNT,
+    sweep_generation_count: int = SWEEP_GENERATION_COUNT,
+    workers: int = 1,
+    quick: bool = False,
+) -> dict:
+    """Alle Benchmarks; `quick` verkürzt Läufe und Wiederholungen für einen
+    schnellen Überblick (nicht mit vollen Läufen vergleichbar)."""
+    if quick:
+        generation_count = min(generation_count, 30_000)
+        sweep_generation_count = min(sweep_generation_count, 3_000)
+
+    results, skipped = benchmark_simulations(generation_count)
+    results.update(
+        benchmark_batch_simulation(
+            min(generation_count, SWEEP_GENERATION_COUNT),
+            BATCH_REPLICAS[:2] if quick else BATCH_REPLICAS,
+        )
+    )
+    results.update(
+        benchmark_chain_simulation(min(generation_count, SWEEP_GENERATION_COUNT))
+    )
+    results.update(
+        benchmark_functions(*((10_000, 3) if quick else (100_000, 5)))
+    )
+    results["write_results_csv"] = benchmark_write_results_csv(
+        *((200, 3) if quick else (2000, 3))
+    )
+    results["sweep"] = benchmark_sweep(sweep_generation_count, workers)
+    for module in IMPORT_MODULES:
+        results[f"import/{module}"] = benchmark_import(module, 3 if quick else 5)
+
+    return {
+        "metadata": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "generation_count": generation_count,
+            "sweep_generation_count": sweep_generation_count,
+            "sweep_points": len(sweep_constants()),
+            "workers": workers,
+        },
+        "results": {name: m._asdict() for name, m in results.items()},
+        # Name -> Grund, warum der Eintrag nicht gemessen werden konnte
+        "skipped": skipped,
+    }
+
+
+def compare(
+    current: dict, baseline: dict, tolerance: float = TOLERANCE
+) -> list[Comparison]:
+    """Vergleicht zwei Ergebnisse von run_benchmarks() Eintrag für Eintrag."""
+    comparisons = []
+    for name, measurement in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None or reference["unit"] != measurement["unit"]:
+            continue
+        value, base = measurement["value"], reference["value"]
+        if measurement["higher_is_better"]:
+            speedup = value / base
+        else:
+            speedup = base / value if value > 0 else math.inf
+        if speedup > 1 + tolerance:
+            verdict = "faster"
+        elif speedup < 1 / (1 + tolerance):
+            verdict = "slower"
+        else:
+            verdict = "unchanged"
+        comparisons.append(Comparison(name, value, base, speedup, verdict))
+    return comparisons
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument(
+        "--baseline", default=None, help="früheres Ergebnis zum Vergleich"
+    )
+    parser.add_argument(
+        "--generation-count", type=int, default=ENTANGLEMENT_GENERATION_COUNT
+    )
+    parser.add_argument(
+        "--sweep-generation-count", type=int, default=SWEEP_GENERATION_COUNT
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit-Code 1, wenn ein Eintrag langsamer als die Baseline ist "
+        "oder der Worker-Import das Budget überschreitet",
+    )
+    args = parser.parse_args()
+
+    current = run_benchmarks(
+        args.generation_count, args.sweep_generation_count, args.workers, args.quick
+    )
+    Path(args.output).write_text(json.dumps(current, indent=2))
+    print(f"Benchmark gespeichert als: {args.output}")
+
+    within_budget = worker_import_within_budget(current)
+    if not within_budget:
+        print(
+            f"Warnung: import {WORKER_MODULE} über dem Budget von "
+            f"{WORKER_IMPORT_BUDGET} ms"
+        )
+
+    for name, reason in current["skipped"].items():
+        print(f"{name:<60} übersprungen: {reason}")
+
+    # erst alles ausgeben, dann mit dem gemeinsamen Status beenden
+    regressed = not within_budget
+    if args.baseline is None:
+        for name, measurement in current["results"].items():
+            print(f"{name:<60} {measurement['value']:>14.1f} {measurement['unit']}")
+    else:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline["metadata"] != current["metadata"]:
+            print("Warnung: Metadaten der Baseline weichen ab")
+        comparisons = compare(current, baseline, args.tolerance)
+        for c in comparisons:
+            print(
+                f"{c.name:<60} {c.value:>14.1f} {c.baseline:>14.1f} "
+                f"{c.speedup:>6.2f}x {c.verdict}"
+            )
+        regressed |= any(c.verdict == "slower" for c in comparisons)
+
+    if args.fail_on_regression and regressed:
+        sys.exit(1)
@@ -0,0 +1,268 @@
+import logging
+import math
+from collections.abc import Callable
+
+import numpy as np
+
+from purify.batch_simulation import NodeArrays
+from purify.constants_tuple import ConstantsTuple
+from purify.my_constants import (
+    DELTA_T,
+    ENTANGLEMENT_GENERATION_COUNT,
+    LENGTH,
+    P_G,
+    QUBIT_ARRIVAL_SCALE,
+    QUBIT_ENTANGLEMENT_FACTOR,
+    C,
+)
+from purify.my_enums import Event, Strategy
+from purify.my_time import ScheduledEvent, Time
+from purify.qubit import teleportation_fidelity
+from purify.statistics import RunningStatistics
+from purify.utils.random_util import RandomStream
+
+logger = logging.getLogger(__name__)
+
+
+def swap_fidelity(fidelities: np.ndarray) -> float:
+    """
+    Fidelity des Ende-zu-Ende-Paares nach Entanglement Swapping entlang aller
+    Links. Die Paare werden als Werner-States behandelt (Twirling), dann
+    multiplizieren sich die Werner-Parameter p = (4F - 1) / 3.
+    """
+    werner_parameter = np.prod((4 * np.asarray(fidelities) - 1) / 3)
+    return float(0.25 + 0.75 * werner_parameter)
+
+
+class ChainSimulation:
+    """
+    Repeater-Kette aus `links` Links der Länge LENGTH zwischen Quelle und
+    Ziel. Jeder Link verhält sich wie die good/bad memory von Node mit der
+    Strategie aus `constants`; der Zustand aller Links liegt in NodeArrays.
+    Alle Links versuchen im Takt DELTA_T gleichzeitig zu erzeugen. Wie in
+    Simulation mit skip_failed_generations wird pro Link nur der nächste
+    erfolgreiche Versuch (geometrisch) gezogen. Solange keine Anfrage wartet,
+    ändert sich bis zur nächsten Ankunft nichts Beobachtbares, daher deckt ein
+    Ereignis der gemeinsamen Warteschlange dann alle Schlitze bis dorthin ab;
+    die Erfolge darin werden rundenweise für alle Links zugleich verarbeitet.
+
+    Anfragen kommen an der Quelle an (eine Queue wie in Node). Sobald jeder
+    Link ein Paar hält, wird entlang der Kette geswappt und teleportiert.
+    Solange eine Anfrage wartet, pumpen Links mit Paar nicht weiter: ein
+    Fehlschlag würde ihr Paar verwerfen, und bei hunderten Links wäre nie
+    jeder Link gleichzeitig belegt. Neue Paare gehen dann nur an leere Links.
+    Die Latenz enthält die klassische Nachricht der Swap-Ergebnisse über die
+    gesamte Strecke, während der das Ende-zu-Ende-Paar und das Qubit weiter
+    dekohärieren.
+
+    Grenzen: Ohne verschachteltes Purifizieren multiplizieren sich die
+    Werner-Parameter, bei F = 0.8 pro Link liegt das Ende-zu-Ende-Paar schon
+    ab vier Links unter F = 1/2 und nähert sich danach 1/4. Lange Ketten
+    zeigen also die Skalierung, keine brauchbare Fidelity. Die Laufzeit der
+    Pump-Strategien wächst mit der Zahl der Runden (etwa P_G *
+    generation_count, eine pro Erfolg des schnellsten Links) und nur schwach
+    mit `links`: mit ENTANGLEMENT_GENERATION_COUNT etwa 5 s für einen und
+    12 s für 300 Links. Für einen einzelnen Link ist Simulation schneller.
+    """
+
+    def __init__(
+        self,
+        constants: ConstantsTuple,
+        links: int,
+        seed=None,
+        write_result: Callable[[float, float, ConstantsTuple], None] | None = None,
+        generation_count: int = ENTANGLEMENT_GENERATION_COUNT,
+    ) -> None:
+        if links < 1:
+            raise ValueError("links must be at least 1")
+
+        self.constants = constants
+        self.links = links
+        self.generation_count = generation_count
+        self.write_result = write_result
+        self.rng = RandomStream(seed)
+        self.time = Time()
+        self.nodes = NodeArrays(constants, links, self.rng)
+
+        # Swap-Ergebnisse laufen über die gesamte Strecke (bei einem Link
+        # ist kein Swap nötig)
+        self.classical_delay = (links - 1) * LENGTH / C if links > 1 else 0.0
+
+        self.queue_present = False
+        self.queue_creation_time = 0.0
+
+        self.fidelity = RunningStatistics()
+        self.latency = RunningStatistics()
+
+        # blockweise erzeugt, siehe Simulation
+        self.request_sample_count = round(generation_count / QUBIT_ENTANGLEMENT_FACTOR)
+        self.request_samples = self.rng.split(2 * self.request_sample_count).gammas(
+            2, 1 / QUBIT_ARRIVAL_SCALE, self.request_sample_count
+        )
+
+        self._all_links = np.ones(links, dtype=bool)
+        self._now = np.zeros(links)
+        # zuletzt verarbeiteter Schlitz und nächster erfolgreicher Schlitz je Link
+        self._slot = 0
+        self._next_success = self.rng.geometrics(P_G, links)
+        self._next_arrival_time = math.inf
+
+        self._schedule_request_arrival()
+        self._schedule_entanglement_generation()
+
+    def _schedule_entanglement_generation(self) -> None:
+        remaining = self.generation_count - self.time.entanglement_count
+        if remaining <= 0:
+            return
+
+        if self.queue_present:
+            # bedient werden kann erst, wenn ein leerer Link ein Paar erzeugt
+            # (einer ist immer leer, sonst wäre die Anfrage schon bedient)
+            empty = ~self.nodes.good_memory.present
+            slots = max(1, int(self._next_success[empty].min()) - self._slot)
+        else:
+            # alle Schlitze vor der nächsten Ankunft auf einmal
+            if self.time.request_count < self.request_sample_count:
+                next_arrival = self._next_arrival_time
+                slots = max(1, math.ceil(next_arrival / DELTA_T) - 1 - self._slot)
+            else:
+                slots = remaining
+        slots = min(slots, remaining)
+
+        self.time.schedule_at(
+            (self._slot + slots) * DELTA_T,
+            Event.ENTANGLEMENT_GENERATION,
+            self._on_entanglement_generation,
+            slots,
+        )
+
+    def _schedule_request_arrival(self) -> None:
+        if self.time.request_count < self.request_sample_count:
+            scheduled = self.time.schedule(
+                next(self.request_samples),
+                Event.REQUEST_ARRIVAL,
+                self._on_request_arrival,
+            )
+            self._next_arrival_time = scheduled.time
+
+    def _on_entanglement_generation(self, scheduled: ScheduledEvent) -> None:
+        slots: int = scheduled.data
+        last_slot = self._slot + slots
+        self.time.entanglement_count += slots
+
+        if self.constants.strategy == Strategy.ALWAYS_REPLACE:
+            self._replace_with_last_success(last_slot)
+        else:
+            # Runde für Runde den jeweils nächsten Erfolg aller Links
+            # verarbeiten, die noch einen im Fenster haben
+            while True:
+                successful = self._next_success <= last_slot
+                if not successful.any():
+                    break
+                np.multiply(self._next_success, DELTA_T, out=self._now)
+                mask = successful
+                if self.queue_present:
+                    # Links mit Paar halten es, bis die Kette vollständig ist
+                    mask = successful & ~self.nodes.good_memory.present
+                self.nodes.handle_entanglement_generation(mask, self._now, successful)
+                self._next_success[successful] += self.rng.geometrics(
+                    P_G, int(successful.sum())
+                )
+
+        self._slot = last_slot
+        self._serve_request()
+
+        self._schedule_entanglement_generation()
+
+    def _replace_with_last_success(self, last_slot: int) -> None:
+        """
+        Bei ALWAYS_REPLACE hat ein neues Paar immer die Anfangs-Fidelity und
+        ersetzt daher jedes gealterte Paar in good memory. Am Ende des
+        Fensters zählt also nur der letzte Erfolg. Er liegt (rückwärts
+        gezählt, gedächtnislos) geometrisch vor dem Fensterende, aber nicht
+        vor dem ersten Erfolg.
+        """
+        successful = self._next_success <= last_slot
+        count = int(successful.sum())
+        if count == 0:
+            return
+
+        last_success = np.maximum(
+            last_slot + 1 - self.rng.geometrics(P_G, count),
+            self._next_success[successful],
+        )
+        self._next_success[successful] = last_success
+        np.multiply(self._next_success, DELTA_T, out=self._now)
+        self.nodes.handle_entanglement_generation(successful, self._now, successful)
+        self._next_success[successful] = last_slot + self.rng.geometrics(P_G, count)
+
+    def _on_request_arrival(self, scheduled: ScheduledEvent) -> None:
+        self.time.request_count += 1
+        # volle Queue: Anfrage wird verworfen (wie Node)
+        if not self.queue_present:
+            self.queue_present = True
+            self.queue_creation_time = scheduled.time
+        self._serve_request()
+
+        self._schedule_request_arrival()
+
+    def _serve_request(self) -> None:
+        if not self.queue_present or not self.nodes.good_memory.present.all():
+            return
+
+        now = self.time.get_current_time()
+        tc = self.constants.decoherence_time
+        self._now.fill(now)
+        links = self.nodes.good_memory.current_fidelity(self._now, tc)
+
+        # Ende-zu-Ende-Paar zerfällt, bis die Swap-Ergebnisse angekommen sind
+        end_to_end = swap_fidelity(links)
+        end_to_end = 0.25 + (end_to_end - 0.25) * math.exp(-self.classical_delay / tc)
+
+        latency = now - self.queue_creation_time + self.classical_delay
+        qubit_fidelity = (
+            math.exp(-latency * self.constants.waiting_time_sensitivity / tc) + 2.0
+        ) / 3.0
+        fidelity = float(teleportation_fidelity(end_to_end, qubit_fidelity))
+
+        self.fidelity.add(fidelity)
+        self.latency.add(latency)
+        if self.write_result is not None:
+            self.write_result(fidelity, latency, self.constants)
+
+        self.queue_present = False
+        self.nodes.consume(self._all_links)
+
+    def step(self) -> bool:
+        """Eine Simulationsiteration. Gibt False zurück, wenn Samples
+        verbraucht sind."""
+        if self.time.entanglement_count >= self.generation_count or (
+            self.time.request_count >= self.request_sample_count
+        ):
+            return False
+
+        scheduled = self.time.pop()
+        if scheduled is None:
+            return False
+
+        scheduled.handler(scheduled)
+        return True
+
+    def run(self) -> None:
+        while self.step():
+            pass
+
+    def summary(self) -> dict:
+        """Mittelwerte und Standardfehler von Ende-zu-Ende-Fidelity und Latenz,
+        NaN, solange keine Anfrage bedient wurde (wie Simulation)."""
+        served = self.fidelity.count
+        return {
+            "links": self.links,
+            "path_length": self.links * LENGTH,
+            "served": served,
+            "requests": self.time.request_count,
+            "fidelity_mean": self.fidelity.mean if served else math.nan,
+            "fidelity_standard_error": self.fidelity.standard_error,
+            "latency_mean": self.latency.mean if self.latency.count else math.nan,
+            "latency_standard_error": self.latency.standard_error,
+        }
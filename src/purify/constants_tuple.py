@@ -9,4 +9,8 @@ class ConstantsTuple(NamedTuple):
     pumping_probability: float
     waiting_time_sensitivity:float
     lambda_strategy: LambdaSrategy
+    # Anzahl der Speicherplätze (2 = good und bad memory)
+    memory_slots: int = 2
+    # Anzahl der Anfragen, die gleichzeitig warten können
+    queue_capacity: int = 1
 
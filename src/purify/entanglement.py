@@ -1,4 +1,6 @@
 import logging
+import math
+from typing import NamedTuple
 
 import numpy as np
 
@@ -9,10 +11,23 @@ from purify.my_constants import (
 )
 from purify.my_time import Time
 from purify.utils.generate_lambdas_util import generate_y_z
+from purify.utils.random_util import RandomStream
 
 logger = logging.getLogger(__name__)
 
 
+class EntanglementState(NamedTuple):
+    """
+    Zustand (F, lambda_1, lambda_2, lambda_3) einer Verschränkung zu einem
+    festen Zeitpunkt. Die Felder dürfen auch NumPy-Arrays sein.
+    """
+
+    fidelity: float
+    lambda_1: float
+    lambda_2: float
+    lambda_3: float
+
+
 class Entanglement:
     """
     Repräsentiert ein erzeugtes Verschränkungs-Paar.
@@ -50,6 +65,16 @@ class Entanglement:
     def get_current_lambda_3(self) -> float:
         return self.__depolarization_noise(self.creation_lambda_3)
 
+    def snapshot(self) -> EntanglementState:
+        """Aktueller Zustand; der Zerfallsfaktor wird nur einmal berechnet."""
+        time_alive = self._time.get_current_time() - self.creationTime
+        decay = math.exp(-time_alive / self.decoherence_time)
+        return EntanglementState(
+            decay * (self.creationFidelity - 0.25) + 0.25,
+            decay * (self.creation_lambda_1 - 0.25) + 0.25,
+            decay * (self.creation_lambda_2 - 0.25) + 0.25,
+            decay * (self.creation_lambda_3 - 0.25) + 0.25,
+        )
 
     def __depolarization_noise(self, start_val) -> float:
         current_time = self._time.get_current_time()
@@ -67,30 +92,46 @@ class Entanglement:
         (Fidelity und Lambdas).
         cls (Class): Die Klasse Entanglement selbst (wird automatisch übergeben).
         """
-        initial_fidelity = 1.0 - (LAMBDA_1 + LAMBDA_2 + LAMBDA_3)
+        return cls.from_lambdas(
+            time, decoherence_time, LAMBDA_1, LAMBDA_2, LAMBDA_3
+        )
+
+    @classmethod
+    def from_lambdas(
+        cls,
+        time: Time,
+        decoherence_time: float,
+        lambda_1: float,
+        lambda_2: float,
+        lambda_3: float,
+    ):
+        """Bell-diagonales Paar mit den gegebenen lambdas, F = 1 - Summe."""
+        initial_fidelity = 1.0 - (lambda_1 + lambda_2 + lambda_3)
 
         return cls(  # 'cls' steht für die Klasse Entanglement
             time=time,
             creation_time=time.get_current_time(),
             creation_fidelity=initial_fidelity,
-            creation_lambda_1=LAMBDA_1,
-            creation_lambda_2=LAMBDA_2,
-            creation_lambda_3=LAMBDA_3,
+            creation_lambda_1=lambda_1,
+            creation_lambda_2=lambda_2,
+            creation_lambda_3=lambda_3,
             decoherence_time = decoherence_time
         )
 
 
     @classmethod
-    def from_random_with_biggest_lambda(cls, time: Time, decoherence_time: float):
+    def from_random_with_biggest_lambda(
+        cls, time: Time, decoherence_time: float, rng: RandomStream | None = None
+    ):
         """
         Erzeugt entanglement, für das gilt: x > (y + z). x,y,z sind lambda werte
         """
 
         creation_fidelity = 0.7
         lambda_1 = LAMBDA_1
-        (y,z) = generate_y_z(lambda_1,creation_fidelity)
+        (y,z) = generate_y_z(lambda_1,creation_fidelity, rng=rng)
 
-        logger.warning(f"lambda_2: {y} und lambda_3: {z}")
+        logger.debug("lambda_2: %s und lambda_3: %s", y, z)
 
         return cls(
             time=time,
@@ -0,0 +1,193 @@
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from purify.entanglement import EntanglementState
+from purify.my_enums import Protocol
+from purify.utils.purification_util import PURIFICATION_FUNCTIONS
+
+logger = logging.getLogger(__name__)
+
+"""
+Erfolgswahrscheinlichkeit und Jump-Funktion aller Protokolle auf dichten
+Gittern über (F_good, lambda_1, lambda_2, lambda_3, age), mit einem Aufruf pro
+Protokoll statt einer Python-Schleife über die Punkte.
+
+- F_good: Fidelity des Paars in good memory (Werner-Zustand, siehe
+  Purification)
+- lambda_1..3: neues Paar bei seiner Erzeugung, F = 1 - lambda_1 - lambda_2
+  - lambda_3
+- age: Alter des neuen Paars in Einheiten der decoherence_time; alle vier
+  Werte depolarisieren wie in Entanglement.snapshot() Richtung 1/4
+
+Punkte außerhalb des Simplex (lambda_1 + lambda_2 + lambda_3 > 1) und bei PMD
+Punkte, an denen lambda_2 oder lambda_3 des (gealterten) neuen Paars ungleich 0
+ist, NaN.
+"""
+
+AXES = ("fidelity", "lambda_1", "lambda_2", "lambda_3", "age")
+# Standardgitter: 101 * 21^3 = 935 361 Punkte
+FIDELITY_POINTS = 101
+LAMBDA_POINTS = 21
+LAMBDA_MAX = 0.5
+AGE_POINTS = 1
+AGE_MAX = 1.0
+JUMP_MAPS_FILE = "jump_maps.npz"
+
+
+class JumpMaps(NamedTuple):
+    # Name der Achse -> 1D-Gitter, in der Reihenfolge von AXES
+    axes: dict[str, np.ndarray]
+    # Protocol -> Array der Form (len(fidelity), ..., len(age))
+    success_probability: dict[Protocol, np.ndarray]
+    jump: dict[Protocol, np.ndarray]
+
+
+def fresh_state(lambda_1, lambda_2, lambda_3, age=0.0) -> EntanglementState:
+    """Neues Paar mit den gegebenen lambdas nach `age` decoherence_times."""
+    decay = np.exp(-np.asarray(age, dtype=np.float64))
+    return EntanglementState(
+        decay * (1.0 - (lambda_1 + lambda_2 + lambda_3) - 0.25) + 0.25,
+        decay * (lambda_1 - 0.25) + 0.25,
+        decay * (lambda_2 - 0.25) + 0.25,
+        decay * (lambda_3 - 0.25) + 0.25,
+    )
+
+
+def evaluate(
+    protocol: Protocol, fidelity, lambda_1, lambda_2, lambda_3, age=0.0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (Erfolgswahrscheinlichkeit, Fidelity nach dem Pumpen) für broadcastbare
+    Arrays; das Ergebnis hat die gemeinsame Form aller Argumente.
+    """
+    fidelity, lambda_1, lambda_2, lambda_3, age = (
+        np.asarray(value, dtype=np.float64)
+        for value in (fidelity, lambda_1, lambda_2, lambda_3, age)
+    )
+    bad = fresh_state(lambda_1, lambda_2, lambda_3, age)
+    invalid = lambda_1 + lambda_2 + lambda_3 > 1.0
+    if protocol == Protocol.PMD:
+        # PMD ist nur für lambda_2 = lambda_3 = 0 definiert; die übrigen Punkte
+        # werden mit 0 gerechnet und danach verworfen
+        invalid = invalid | (bad.lambda_2 != 0) | (bad.lambda_3 != 0)
+        bad = bad._replace(lambda_2=0.0, lambda_3=0.0)
+
+    success_probability, jump_function = PURIFICATION_FUNCTIONS[protocol]
+    good = EntanglementState(fidelity, 0.0, 0.0, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        success = success_probability(good, bad)
+        jump = jump_function(good, bad)
+    shape = np.broadcast_shapes(fidelity.shape, invalid.shape, age.shape)
+    success = np.where(invalid, np.nan, np.broadcast_to(success, shape))
+    jump = np.where(invalid, np.nan, np.broadcast_to(jump, shape))
+    return success, jump
+
+
+def jump_maps(
+    fidelity,
+    lambda_1,
+    lambda_2,
+    lambda_3,
+    age=(0.0,),
+    protocols: tuple[Protocol, ...] = tuple(Protocol),
+) -> JumpMaps:
+    """
+    Alle Protokolle auf dem vollen Gitter der fünf 1D-Achsen. Die Achsen
+    werden nur per Broadcasting kombiniert (np.ix_), Speicher braucht also
+    nur das Ergebnis.
+    """
+    axes = {
+        name: np.asarray(values, dtype=np.float64).ravel()
+        for name, values in zip(AXES, (fidelity, lambda_1, lambda_2, lambda_3, age))
+    }
+    grid = np.ix_(*axes.values())
+    success_probability, jump = {}, {}
+    for protocol in protocols:
+        success_probability[protocol], jump[protocol] = evaluate(protocol, *grid)
+    return JumpMaps(axes, success_probability, jump)
+
+
+def default_jump_maps(
+    fidelity_points: int = FIDELITY_POINTS,
+    lambda_points: int = LAMBDA_POINTS,
+    lambda_max: float = LAMBDA_MAX,
+    age_points: int = AGE_POINTS,
+    age_max: float = AGE_MAX,
+) -> JumpMaps:
+    lambdas = np.linspace(0.0, lambda_max, lambda_points)
+    return jump_maps(
+        np.linspace(0.0, 1.0, fidelity_points),
+        lambdas,
+        lambdas,
+        lambdas,
+        np.linspace(0.0, age_max, age_points) if age_points > 1 else (0.0,),
+    )
+
+
+def save_jump_maps(path: str | Path, maps: JumpMaps) -> None:
+    """Achsen und Karten als .npz, Schlüssel z.B. "PROT_1_jump"."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays = dict(maps.axes)
+    for protocol in maps.jump:
+        arrays[f"{protocol.name}_success_probability"] = maps.success_probability[
+            protocol
+        ]
+        arrays[f"{protocol.name}_jump"] = maps.jump[protocol]
+    np.savez(path, **arrays)
+
+
+def load_jump_maps(path: str | Path) -> JumpMaps:
+    with np.load(path) as data:
+        axes = {name: data[name] for name in AXES}
+        protocols = [
+            protocol for protocol in Protocol if f"{protocol.name}_jump" in data
+        ]
+        return JumpMaps(
+            axes,
+            {p: data[f"{p.name}_success_probability"] for p in protocols},
+            {p: data[f"{p.name}_jump"] for p in protocols},
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default=JUMP_MAPS_FILE)
+    parser.add_argument("--fidelity-points", type=int, default=FIDELITY_POINTS)
+    parser.add_argument("--lambda-points", type=int, default=LAMBDA_POINTS)
+    parser.add_argument("--lambda-max", type=float, default=LAMBDA_MAX)
+    parser.add_argument(
+        "--age-points",
+        type=int,
+        default=AGE_POINTS,
+        help="Punkte für das Alter des neuen Paars (1: nur frische Paare)",
+    )
+    parser.add_argument(
+        "--age-max",
+        type=float,
+        default=AGE_MAX,
+        help="größtes Alter in Einheiten der decoherence_time",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    maps = default_jump_maps(
+        args.fidelity_points,
+        args.lambda_points,
+        args.lambda_max,
+        args.age_points,
+        args.age_max,
+    )
+    elapsed = time.perf_counter() - start
+    save_jump_maps(args.output, maps)
+
+    points = int(np.prod([len(axis) for axis in maps.axes.values()]))
+    print(
+        f"{points} Punkte x {len(maps.jump)} Protokolle in {elapsed:.2f} s, "
+        f"gespeichert als: {args.output}"
+    )
@@ -0,0 +1,362 @@
+import argparse
+import csv
+import logging
+import os
+from collections import Counter
+from functools import partial
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from purify.analytic_solver import solve
+from purify.constants_tuple import ConstantsTuple
+from purify.my_constants import DECOHERENCE_TIMES
+from purify.my_enums import LambdaSrategy, Strategy
+
+logger = logging.getLogger(__name__)
+
+"""
+Sucht auf einem Gitter über den lambda-Simplex (lambda_i >= 0, Summe <= 1)
+und die decoherence_times die Strategie mit der höchsten mittleren
+Teleportations-Fidelity der bedienten Anfragen. Statt my_constants pro Tripel
+zu ändern, werden die lambdas direkt an analytic_solver.solve (Standard) oder
+an Simulation übergeben. Die Kandidaten werden auf einen Prozess-Pool
+verteilt.
+"""
+
+# PMD nur dort, wo lambda_2 = lambda_3 = 0
+OPTIMIZER_STRATEGIES = (
+    Strategy.ALWAYS_REPLACE,
+    Strategy.ALWAYS_PROT_1,
+    Strategy.ALWAYS_PROT_2,
+    Strategy.ALWAYS_PROT_3,
+    Strategy.ALWAYS_PMD,
+)
+LAMBDA_STEP = 0.1
+# Summe der lambdas höchstens 0.5, neue Paare also mit F >= 0.5
+LAMBDA_SUM_MAX = 0.5
+# gröber als der Standard von solve(), der Fehler wird trotzdem mitgeliefert
+CELL_WIDTH = 0.02
+OPTIMIZER_FILE = "lambda_optimizer.csv"
+
+
+class Candidate(NamedTuple):
+    lambdas: tuple[float, float, float]
+    decoherence_time: float
+    strategy: Strategy
+
+
+class Evaluation(NamedTuple):
+    candidate: Candidate
+    fidelity: float
+    # analytisch: Abweichung zum groben Gitter, Simulation: halbe Breite des
+    # 95%-Konfidenzintervalls
+    fidelity_error: float
+    waiting_time: float
+    served_fraction: float
+
+
+class Optimum(NamedTuple):
+    lambdas: tuple[float, float, float]
+    decoherence_time: float
+    strategy: Strategy
+    fidelity: float
+    # zweitbeste Strategie und Abstand zu ihr
+    runner_up: Strategy | None
+    margin: float
+    # False, wenn der Abstand innerhalb der Fehler beider Strategien liegt
+    resolved: bool
+
+
+def simplex_lambdas(
+    step: float = LAMBDA_STEP, sum_max: float = LAMBDA_SUM_MAX
+) -> list[tuple[float, float, float]]:
+    """Alle (lambda_1, lambda_2, lambda_3) auf dem Gitter mit Weite `step` und
+    Summe höchstens `sum_max`."""
+    steps = round(sum_max / step)
+    return [
+        (round(i * step, 10), round(j * step, 10), round(k * step, 10))
+        for i in range(steps + 1)
+        for j in range(steps + 1 - i)
+        for k in range(steps + 1 - i - j)
+    ]
+
+
+def optimizer_candidates(
+    lambdas_list: list[tuple[float, float, float]],
+    decoherence_times: list[float],
+    strategies: tuple[Strategy, ...] = OPTIMIZER_STRATEGIES,
+) -> list[Candidate]:
+    return [
+        Candidate(lambdas, decoherence_time, strategy)
+        for lambdas in lambdas_list
+        for decoherence_time in decoherence_times
+        for strategy in strategies
+        if strategy != Strategy.ALWAYS_PMD or lambdas[1] == lambdas[2] == 0
+    ]
+
+
+def _evaluation_key(candidate: Candidate) -> Candidate:
+    """ALWAYS_REPLACE hängt nur von F = 1 - Summe der lambdas ab; alle Tripel
+    mit gleicher Summe teilen sich eine Auswertung."""
+    if candidate.strategy == Strategy.ALWAYS_REPLACE:
+        return candidate._replace(lambdas=(round(sum(candidate.lambdas), 10), 0.0, 0.0))
+    return candidate
+
+
+def _constants(candidate: Candidate) -> ConstantsTuple:
+    return ConstantsTuple(
+        candidate.strategy,
+        candidate.decoherence_time,
+        1.0,
+        1,
+        LambdaSrategy.USE_CONSTANTS,
+    )
+
+
+def evaluate_candidate(
+    candidate: Candidate,
+    cell_width: float = CELL_WIDTH,
+    generation_count: int | None = None,
+    seed: np.random.SeedSequence | None = None,
+) -> tuple[float, float, float, float]:
+    """
+    (fidelity, fidelity_error, waiting_time, served_fraction) eines Kandidaten,
+    analytisch oder mit `generation_count` simulierten Erzeugungsversuchen.
+    """
+    constants = _constants(candidate)
+    if generation_count is None:
+        result = solve(constants, cell_width=cell_width, lambdas=candidate.lambdas)
+        return (
+            result.fidelity,
+            result.fidelity_error,
+            result.waiting_time,
+            result.served_fraction,
+        )
+
+    from purify.my_simulation import Simulation
+
+    sim = Simulation(
+        constants,
+        write_result=lambda *_: None,
+        seed=seed,
+        skip_failed_generations=True,
+        generation_count=generation_count,
+        lambdas=candidate.lambdas,
+    )
+    result = sim.run_until_precision(0.0, min_generations=generation_count)
+    return (
+        result.fidelity_mean,
+        result.fidelity_half_width,
+        result.waiting_time_mean,
+        result.served / max(sim.time.request_count, 1),
+    )
+
+
+def _evaluate_task(task, cell_width: float, generation_count: int | None):
+    candidate, seed = task
+    try:
+        return evaluate_candidate(candidate, cell_width, generation_count, seed)
+    except Exception as e:
+        logger.warning(f"{candidate}: skipped ({e})")
+        return None
+
+
+def optimize(
+    lambdas_list: list[tuple[float, float, float]] | None = None,
+    decoherence_times: list[float] = DECOHERENCE_TIMES,
+    strategies: tuple[Strategy, ...] = OPTIMIZER_STRATEGIES,
+    workers: int | None = None,
+    cell_width: float = CELL_WIDTH,
+    generation_count: int | None = None,
+    seed: int | None = None,
+) -> list[Evaluation]:
+    """
+    Wertet alle Kandidaten aus, verteilt auf `workers` Prozesse (Standard: alle
+    CPU-Kerne). Ohne `generation_count` mit analytic_solver.solve, sonst per
+    Simulation; dann teilen sich alle Strategien eines Punkts (lambdas,
+    decoherence_time) denselben Seed. Kandidaten, die nicht ausgewertet werden
+    können, fehlen im Ergebnis.
+    """
+    if lambdas_list is None:
+        lambdas_list = simplex_lambdas()
+    for lambdas in lambdas_list:
+        if min(lambdas) < 0 or sum(lambdas) > 1:
+            raise ValueError(f"lambdas {lambdas} are outside the simplex")
+
+    candidates = optimizer_candidates(lambdas_list, decoherence_times, strategies)
+    # mit Simulation bleibt jeder Kandidat bei seinem Punkt und dessen Seed
+    key = _evaluation_key if generation_count is None else lambda c: c
+    keys = list(dict.fromkeys(key(c) for c in candidates))
+
+    points = list(dict.fromkeys((c.lambdas, c.decoherence_time) for c in keys))
+    point_seeds = dict(zip(points, np.random.SeedSequence(seed).spawn(len(points))))
+    tasks = [(k, point_seeds[(k.lambdas, k.decoherence_time)]) for k in keys]
+
+    run_task = partial(
+        _evaluate_task, cell_width=cell_width, generation_count=generation_count
+    )
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = list(map(run_task, tasks))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_task, tasks))
+    evaluated = dict(zip(keys, results))
+
+    return [
+        Evaluation(candidate, *evaluated[key(candidate)])
+        for candidate in candidates
+        if evaluated[key(candidate)] is not None
+    ]
+
+
+def best_strategies(evaluations: list[Evaluation]) -> list[Optimum]:
+    """Die beste Strategie pro (lambdas, decoherence_time)."""
+    points: dict[tuple, list[Evaluation]] = {}
+    for evaluation in evaluations:
+        candidate = evaluation.candidate
+        points.setdefault((candidate.lambdas, candidate.decoherence_time), []).append(
+            evaluation
+        )
+
+    optima = []
+    for (lambdas, decoherence_time), point in points.items():
+        ranked = sorted(point, key=lambda evaluation: -evaluation.fidelity)
+        best = ranked[0]
+        if len(ranked) > 1:
+            second = ranked[1]
+            margin = best.fidelity - second.fidelity
+            runner_up = second.candidate.strategy
+            resolved = margin > best.fidelity_error + second.fidelity_error
+        else:
+            margin, runner_up, resolved = float("inf"), None, True
+        optima.append(
+            Optimum(
+                lambdas,
+                decoherence_time,
+                best.candidate.strategy,
+                best.fidelity,
+                runner_up,
+                margin,
+                resolved,
+            )
+        )
+    return optima
+
+
+def optimal_regions(optima: list[Optimum]) -> dict[float, Counter[Strategy]]:
+    """Anzahl der Gitterpunkte im Simplex, auf denen eine Strategie gewinnt,
+    pro decoherence_time."""
+    regions: dict[float, Counter[Strategy]] = {}
+    for optimum in optima:
+        regions.setdefault(optimum.decoherence_time, Counter())[optimum.strategy] += 1
+    return dict(sorted(regions.items()))
+
+
+def write_optimizer_csv(
+    path: str | Path, evaluations: list[Evaluation], optima: list[Optimum]
+) -> None:
+    """Alle Auswertungen, eine Zeile pro Kandidat; `optimal` markiert die
+    beste Strategie eines Punkts."""
+    best = {(o.lambdas, o.decoherence_time): o.strategy for o in optima}
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open(mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "lambda_1",
+                "lambda_2",
+                "lambda_3",
+                "decoherence_time",
+                "strategy",
+                "fidelity",
+                "fidelity_error",
+                "waiting_time",
+                "served_fraction",
+                "optimal",
+            ]
+        )
+        for evaluation in evaluations:
+            candidate = evaluation.candidate
+            writer.writerow(
+                [
+                    *candidate.lambdas,
+                    candidate.decoherence_time,
+                    candidate.strategy.name,
+                    evaluation.fidelity,
+                    evaluation.fidelity_error,
+                    evaluation.waiting_time,
+                    evaluation.served_fraction,
+                    best[(candidate.lambdas, candidate.decoherence_time)]
+                    == candidate.strategy,
+                ]
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default=OPTIMIZER_FILE)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Anzahl paralleler Prozesse (Standard: alle CPU-Kerne)",
+    )
+    parser.add_argument("--lambda-step", type=float, default=LAMBDA_STEP)
+    parser.add_argument(
+        "--lambda-sum-max",
+        type=float,
+        default=LAMBDA_SUM_MAX,
+        help="größte Summe der lambdas (neue Paare mit F >= 1 - Summe)",
+    )
+    parser.add_argument(
+        "--decoherence-times",
+        type=float,
+        nargs="+",
+        default=DECOHERENCE_TIMES,
+    )
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=[strategy.name for strategy in OPTIMIZER_STRATEGIES],
+        choices=[strategy.name for strategy in Strategy],
+    )
+    parser.add_argument("--cell-width", type=float, default=CELL_WIDTH)
+    parser.add_argument(
+        "--simulate",
+        type=int,
+        default=None,
+        metavar="GENERATIONS",
+        help="statt analytisch mit so vielen Erzeugungsversuchen simulieren",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    evaluations = optimize(
+        simplex_lambdas(args.lambda_step, args.lambda_sum_max),
+        args.decoherence_times,
+        tuple(Strategy[name] for name in args.strategies),
+        workers=args.workers,
+        cell_width=args.cell_width,
+        generation_count=args.simulate,
+        seed=args.seed,
+    )
+    optima = best_strategies(evaluations)
+    write_optimizer_csv(args.output, evaluations, optima)
+
+    for decoherence_time, counts in optimal_regions(optima).items():
+        total = sum(counts.values())
+        shares = ", ".join(
+            f"{strategy.name} {count / total:.0%}"
+            for strategy, count in counts.most_common()
+        )
+        print(f"t_c={decoherence_time:<8} {shares}")
+    unresolved = sum(not optimum.resolved for optimum in optima)
+    if unresolved:
+        print(f"{unresolved} Punkte ohne eindeutigen Gewinner (innerhalb der Fehler)")
+    print(f"Ergebnisse gespeichert als: {args.output}")
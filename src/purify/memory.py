@@ -0,0 +1,74 @@
+import bisect
+import itertools
+import math
+
+from purify.entanglement import Entanglement
+
+
+def ordering_key(entanglement: Entanglement) -> float:
+    """
+    Zeitunabhängiger Sortierschlüssel. Alle Paare depolarisieren mit derselben
+    Dekohärenzzeit, log(F(t) - 1/4) = log(F_0 - 1/4) + t_0/t_c - t/t_c, also
+    ändert sich die Reihenfolge der Paare mit der Zeit nicht.
+    """
+    excess = entanglement.creationFidelity - 0.25
+    if excess <= 0:
+        return -math.inf
+    return math.log(excess) + entanglement.creationTime / entanglement.decoherence_time
+
+
+class Memory:
+    """
+    `capacity` Speicherplätze, nach aktueller Fidelity sortiert (bisect auf
+    ordering_key). best() ist die bisherige good memory, second() die bad
+    memory. Bei gleichem Schlüssel gilt das ältere Paar als besser.
+
+    Eine sortierte Liste, kein Heap: insort sucht in O(log K), das Einfügen
+    verschiebt aber O(K) Einträge. Bei den wenigen Speicherplätzen
+    (memory_slots) ist das billiger als ein Heap, der für second() und
+    worst() ohnehin nicht reicht.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("memory needs at least one slot")
+        self.capacity = capacity
+        # aufsteigend sortiert: (key, -sequence, entanglement)
+        self._slots: list[tuple[float, int, Entanglement]] = []
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def is_full(self) -> bool:
+        return len(self._slots) >= self.capacity
+
+    def best(self) -> Entanglement | None:
+        return self._slots[-1][2] if self._slots else None
+
+    def second(self) -> Entanglement | None:
+        return self._slots[-2][2] if len(self._slots) > 1 else None
+
+    def worst(self) -> Entanglement | None:
+        return self._slots[0][2] if self._slots else None
+
+    def add(self, entanglement: Entanglement) -> None:
+        if self.is_full():
+            raise Exception("Memory is full")
+        bisect.insort(
+            self._slots,
+            (ordering_key(entanglement), -next(self._sequence), entanglement),
+        )
+
+    def pop_best(self) -> Entanglement:
+        return self._slots.pop()[2]
+
+    def replace_best(self, entanglement: Entanglement) -> None:
+        """Ersetzt das beste Paar (oder belegt einen Platz, wenn leer)."""
+        if self._slots:
+            self._slots.pop()
+        self.add(entanglement)
+
+    def replace_worst(self, entanglement: Entanglement) -> None:
+        del self._slots[0]
+        self.add(entanglement)
@@ -76,3 +76,17 @@ PUMPING_PROBABILTIES = [
     1.0
 ]
 
+
+# Anzahl der Speicherplätze pro Knoten
+MEMORY_SLOTS = [
+    2,
+]
+
+# Länge der Warteschlange für Anfragen
+QUEUE_CAPACITIES = [
+    1,
+]
+
+
+# Verzeichnis für die Ergebnisse einzelner Parameterkombinationen
+RESULT_CACHE_DIR = ".purify_cache"
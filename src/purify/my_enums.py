@@ -19,6 +19,40 @@ class Strategy(Enum):
     ALWAYS_PMD = 10
 
 
+class Protocol(Enum):
+    """Pump-Protokolle aus Purification."""
+
+    PROT_1 = 1
+    PROT_2 = 2
+    PROT_3 = 3
+    PMD = 4
+
+
+class Decision(Enum):
+    """Entscheidung über ein neues Paar bei belegter good memory (Gym-Umgebung)."""
+
+    DISCARD = 0
+    REPLACE = 1
+    PROT_1 = 2
+    PROT_2 = 3
+    PROT_3 = 4
+
+
+class Action(Enum):
+    """Was Node bei einem Ereignis getan hat (für Tracer-Records)."""
+
+    GENERATION_FAILED = 1
+    STORED = 2
+    REPLACED_GOOD = 3
+    REPLACED_BAD = 4
+    DISCARDED = 5
+    PUMP_SUCCEEDED = 6
+    PUMP_FAILED = 7
+    REQUEST_QUEUED = 8
+    REQUEST_DROPPED = 9
+    REQUEST_SERVED = 10
+
+
 class LambdaSrategy(Enum):
     USE_CONSTANTS = 1
     RANDOM_WITH_LARGEST_LAMBDA = 2
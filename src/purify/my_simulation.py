@@ -1,98 +1,315 @@
 import logging
-
-import numpy as np
+import math
+from collections.abc import Callable
+from contextlib import nullcontext
+from statistics import NormalDist
+from time import perf_counter
+from typing import NamedTuple
 
 from purify.constants_tuple import ConstantsTuple
 from purify.my_constants import (
     DELTA_T,
     ENTANGLEMENT_GENERATION_COUNT,
+    P_G,
     QUBIT_ARRIVAL_SCALE,
     QUBIT_ENTANGLEMENT_FACTOR,
 )
-from purify.my_enums import Event
-from purify.my_time import Time
+from purify.my_enums import Event, LambdaSrategy
+from purify.my_time import ScheduledEvent, Time
 from purify.node import Node
+from purify.profiler import Profiler
+from purify.statistics import RunningStatistics
+from purify.timeline import Timeline
+from purify.trace import Tracer
+from purify.utils.csv_utils import write_results_csv
+from purify.utils.purification_table_util import PurificationTable
+from purify.utils.random_util import RandomStream
 
 logger = logging.getLogger(__name__)
-rng = np.random.default_rng()
+
+
+class PrecisionRunResult(NamedTuple):
+    fidelity_mean: float
+    fidelity_half_width: float
+    waiting_time_mean: float
+    waiting_time_half_width: float
+    served: int
+    generation_attempts: int
+    converged: bool
 
 
 class Simulation:
     def __init__(
-        self,  constants: ConstantsTuple
+        self,
+        constants: ConstantsTuple,
+        write_result: Callable[
+            [float, float, ConstantsTuple], None
+        ] = write_results_csv,
+        seed=None,
+        skip_failed_generations: bool = False,
+        trace: bool = False,
+        generation_count: int = ENTANGLEMENT_GENERATION_COUNT,
+        purification_table: bool = False,
+        timeline: Timeline | None = None,
+        antithetic: bool = False,
+        profile: bool = False,
+        lambdas: tuple[float, float, float] | None = None,
     ) -> None:
+        if timeline is not None and generation_count > timeline.generation_count:
+            raise ValueError("generation_count exceeds the timeline")
+
+        # Anzahl der Erzeugungsversuche, bis die Simulation endet
+        self.generation_count = generation_count
+        # vorgegebene Erzeugungsergebnisse und Ankünfte (Common Random Numbers)
+        self.timeline = timeline
+        self._timeline_index = 0
+        # eigener, explizit geseedeter Zufallsstrom pro Simulation
+        # antithetic: gespiegelte Uniforms, siehe RandomStream
+        self.rng = RandomStream(seed, antithetic=antithetic)
         self.time = Time()
-        self.node_a = Node(self.time, constants)
+        # strukturierte Ereignis-Records statt Log-Zeilen, nur wenn gewünscht
+        self.tracer: Tracer | None = Tracer() if trace else None
+        # Zeit und Aufrufe pro Phase, nur wenn gewünscht
+        self.profiler: Profiler | None = Profiler() if profile else None
+        # Pump-Funktionen als Tabelle, da das neue Paar immer gleich ist
+        table: PurificationTable | None = None
+        if purification_table:
+            if constants.lambda_strategy != LambdaSrategy.USE_CONSTANTS:
+                raise ValueError("purification_table requires USE_CONSTANTS")
+            table = (
+                PurificationTable.from_default_lambdas()
+                if lambdas is None
+                else PurificationTable.from_lambdas(*lambdas)
+            )
+        if self.profiler is not None:
+            write_result = self.profiler.timed("write_result", write_result)
+        self.node_a = Node(
+            self.time,
+            constants,
+            write_result,
+            self.rng,
+            self.tracer,
+            table,
+            self.profiler,
+            lambdas,
+        )
         self.constants = constants
 
+        # Statt jeden Erzeugungsversuch einzeln zu würfeln, wird die Anzahl der
+        # Versuche bis zum nächsten Erfolg geometrisch gezogen und direkt
+        # dorthin gesprungen. Fehlgeschlagene Versuche ändern den Zustand von
+        # Node nicht, die Statistik bleibt also gleich.
+        self.skip_failed_generations = skip_failed_generations
 
-        # Samples (hier Bernouli/geometric)
-        self.entanglement_samples = [
-            DELTA_T for _ in range(ENTANGLEMENT_GENERATION_COUNT)
-        ]
+        if skip_failed_generations:
+            self.successful = None
+            self.attempts_until_success = self._next_attempts()
+        else:
+            self.successful = (
+                timeline.successful().tolist() if timeline is not None else None
+            )
 
-        self.request_samples = rng.gamma(
-            shape=2,
-            scale=1 / QUBIT_ARRIVAL_SCALE,
-            size=round(ENTANGLEMENT_GENERATION_COUNT / QUBIT_ENTANGLEMENT_FACTOR),
+        # Zwischenankunftszeiten der Anfragen, blockweise erzeugt statt als
+        # Array über die ganze Simulation. Der Arrival-Strom übernimmt die
+        # Uniforms, die bisher gamma(size=request_count) an dieser Stelle
+        # gezogen hat, die Ergebnisse bleiben also gleich.
+        self.request_sample_count = round(
+            self.generation_count / QUBIT_ENTANGLEMENT_FACTOR
         )
+        if timeline is not None:
+            self.request_samples = iter(
+                timeline.request_samples[: self.request_sample_count]
+            )
+        else:
+            self.request_samples = self.rng.split(
+                2 * self.request_sample_count
+            ).gammas(2, 1 / QUBIT_ARRIVAL_SCALE, self.request_sample_count)
 
-    def step(self) -> bool:
-        """Eine Simulationsiteration. Gibt False zurück, wenn Samples
-        verbraucht sind."""
-        if self.time.entanglement_count >= len(
-            self.entanglement_samples
-        ) or self.time.request_count >= len(self.request_samples):
-            return False
+        # erste Ereignisse beider Quellen einplanen, jede Quelle plant ihr
+        # nächstes Ereignis selbst
+        self._schedule_entanglement_generation()
+        self._schedule_request_arrival()
 
-        self.time.update(
-            self.entanglement_samples[self.time.entanglement_count],
-            self.request_samples[self.time.request_count],
-        )
+    def _next_attempts(self) -> int:
+        """Versuche bis einschließlich zum nächsten Erfolg."""
+        if self.timeline is None:
+            return self.rng.geometric(P_G)
+        attempts = self.timeline.attempts[self._timeline_index]
+        self._timeline_index += 1
+        return attempts
 
-        logger.info(
-            "Current Time: %s | Last Event: %s",
-            round(self.time.get_current_time(), 2),
-            self.time.last_event().name,
-        )
+    def _schedule_entanglement_generation(self) -> None:
+        if self.skip_failed_generations:
+            # nach dem letzten Erfolg bleiben nur noch fehlgeschlagene Versuche
+            attempts = min(
+                self.attempts_until_success,
+                self.generation_count - self.time.entanglement_count,
+            )
+            self.time.schedule(
+                attempts * DELTA_T,
+                Event.ENTANGLEMENT_GENERATION,
+                self._on_entanglement_generation,
+                attempts,
+            )
+        elif self.time.entanglement_count < self.generation_count:
+            self.time.schedule(
+                DELTA_T,
+                Event.ENTANGLEMENT_GENERATION,
+                self._on_entanglement_generation,
+                1,
+            )
 
-        if self.time.last_event() == Event.ENTANGLEMENT_GENERATION:
-            self.node_a.handle_entanglement_generation()
-            self.node_a.serve_request()
+    def _schedule_request_arrival(self) -> None:
+        if self.time.request_count < self.request_sample_count:
+            self.time.schedule(
+                next(self.request_samples),
+                Event.REQUEST_ARRIVAL,
+                self._on_request_arrival,
+            )
 
-        if self.time.last_event() == Event.REQUEST_ARRIVAL:
-            self.node_a.handle_request_arrival()
-            self.node_a.serve_request()
+    def _on_entanglement_generation(self, scheduled: ScheduledEvent) -> None:
+        attempts: int = scheduled.data
+        self.time.entanglement_count += attempts
+
+        if self.skip_failed_generations:
+            successful = attempts == self.attempts_until_success
+            self.attempts_until_success = self._next_attempts()
+        elif self.successful is not None:
+            successful = self.successful[self.time.entanglement_count - 1]
+        else:
+            successful = None
 
-        # Logging
-        if self.node_a.good_memory is not None:
-            e = self.node_a.good_memory
-            logger.info(
-                "Good Memory = F:%s, lambda_1: %s, lambda_2: %s ,lambda_3: %s,",
-                e.get_current_fidelity(),
-                e.get_current_lambda_1(),
-                e.get_current_lambda_2(),
-                e.get_current_lambda_3(),
+        if self.profiler is None:
+            self.node_a.handle_entanglement_generation(successful)
+            self.node_a.serve_request()
+        else:
+            start = perf_counter()
+            branch = self.node_a.handle_entanglement_generation(successful)
+            self.profiler.add(
+                f"handle_entanglement_generation/{branch}", perf_counter() - start
             )
+            self.profiler.call("serve_request", self.node_a.serve_request)
 
+        self._schedule_entanglement_generation()
+
+    def _on_request_arrival(self, scheduled: ScheduledEvent) -> None:
+        self.time.request_count += 1
+        if self.profiler is None:
+            self.node_a.handle_request_arrival()
+            self.node_a.serve_request()
         else:
-            logger.info("Good Memory = None")
-
-        if self.node_a.bad_memory is not None:
-            e = self.node_a.bad_memory
-            logger.info(
-                "Bad Memory = F:%s, lambda_1: %s, lambda_2: %s ,lambda_3: %s,",
-                e.get_current_fidelity(),
-                e.get_current_lambda_1(),
-                e.get_current_lambda_2(),
-                e.get_current_lambda_3(),
+            self.profiler.call(
+                "handle_request_arrival", self.node_a.handle_request_arrival
             )
+            self.profiler.call("serve_request", self.node_a.serve_request)
+
+        self._schedule_request_arrival()
 
+    def step(self) -> bool:
+        """Eine Simulationsiteration. Gibt False zurück, wenn Samples
+        verbraucht sind."""
+        if self.time.entanglement_count >= self.generation_count or (
+            self.time.request_count >= self.request_sample_count
+        ):
+            return False
+
+        if self.profiler is None:
+            scheduled = self.time.pop()
         else:
-            logger.info("Bad Memory = None")
+            scheduled = self.profiler.call("time_advance", self.time.pop)
+        if scheduled is None:
+            return False
+
+        scheduled.handler(scheduled)
 
         return True
 
+    def _profiling(self):
+        """Bucht während eines Laufs die Logger-Aufrufe auf den Profiler."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.timed_logging()
+
     def run(self) -> None:
-        while self.step():
-            pass
+        with self._profiling():
+            while self.step():
+                pass
+
+    def run_until_precision(
+        self,
+        fidelity_half_width: float,
+        waiting_time_half_width: float | None = None,
+        min_generations: int = 10000,
+        max_generations: int | None = None,
+        confidence: float = 0.95,
+        check_interval: int = 1000,
+    ) -> PrecisionRunResult:
+        """
+        Läuft, bis das Konfidenzintervall der mittleren Teleportations-Fidelity
+        (und optional der Wartezeit) höchstens die gegebene halbe Breite hat.
+        Frühestens nach `min_generations`, spätestens nach `max_generations`
+        Erzeugungsversuchen (Standard: generation_count). Bediente Anfragen
+        werden als unabhängig behandelt, da jede Bedienung das Paar verbraucht.
+        """
+        max_generations = min(
+            max_generations or self.generation_count, self.generation_count
+        )
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        fidelity = RunningStatistics()
+        waiting_time = RunningStatistics()
+
+        write_result = self.node_a.write_result
+
+        def observe(teleportation_fidelity, time, constants):
+            fidelity.add(teleportation_fidelity)
+            waiting_time.add(time)
+            write_result(teleportation_fidelity, time, constants)
+
+        def half_widths() -> tuple[float, float]:
+            return (
+                z * fidelity.standard_error,
+                z * waiting_time.standard_error,
+            )
+
+        def precise_enough() -> bool:
+            fidelity_width, waiting_time_width = half_widths()
+            if not fidelity_width <= fidelity_half_width:
+                return False
+            return (
+                waiting_time_half_width is None
+                or waiting_time_width <= waiting_time_half_width
+            )
+
+        self.node_a.write_result = observe
+        converged = False
+        try:
+            with self._profiling():
+                steps = 0
+                while (
+                    self.time.entanglement_count < max_generations and self.step()
+                ):
+                    steps += 1
+                    if (
+                        steps % check_interval == 0
+                        and self.time.entanglement_count >= min_generations
+                        and precise_enough()
+                    ):
+                        converged = True
+                        break
+                else:
+                    converged = precise_enough()
+        finally:
+            self.node_a.write_result = write_result
+
+        fidelity_width, waiting_time_width = half_widths()
+        return PrecisionRunResult(
+            fidelity_mean=float(fidelity.mean) if fidelity.count else math.nan,
+            fidelity_half_width=float(fidelity_width),
+            waiting_time_mean=(
+                float(waiting_time.mean) if waiting_time.count else math.nan
+            ),
+            waiting_time_half_width=float(waiting_time_width),
+            served=fidelity.count,
+            generation_attempts=self.time.entanglement_count,
+            converged=converged,
+        )
@@ -1,33 +1,75 @@
-
+import heapq
+import itertools
+from collections.abc import Callable
+from typing import Any, NamedTuple
 
 from purify.my_enums import Event
 
 
+class ScheduledEvent(NamedTuple):
+    """Ein eingeplantes Ereignis. Sortiert wird nach Zeit, bei gleicher Zeit
+    nach Reihenfolge des Einplanens."""
+
+    time: float
+    sequence: int
+    event: Event
+    handler: Callable[["ScheduledEvent"], None]
+    data: Any = None
+
+
 class Time:
+    """
+    Uhr der Simulation mit einer Ereigniswarteschlange (Binär-Heap).
+    Beliebig viele Quellen können mit schedule() zukünftige Ereignisse
+    einplanen; pop() liefert das nächste Ereignis in O(log n) und stellt die
+    Uhr auf dessen Zeitpunkt.
+    """
+
     def __init__(self) -> None:
-        self.entanglement_time: float = 0.0
+        self.current_time: float = 0.0
+        self.current_event: ScheduledEvent | None = None
         self.entanglement_count: int = 0
-        self.request_time: float = 0.0
         self.request_count: int = 0
+        self._queue: list[ScheduledEvent] = []
+        self._sequence = itertools.count()
 
     def get_current_time(self) -> float:
-        return max(self.entanglement_time, self.request_time)
-
-    def last_event(self) -> Event:
-        if self.entanglement_time > self.request_time:
-            return Event.ENTANGLEMENT_GENERATION
-        else:
-            return Event.REQUEST_ARRIVAL
+        return self.current_time
 
-    def update(self, entanglement_dif: float, request_dif: float) -> None:
-        new_entanglement_time = self.entanglement_time + entanglement_dif
-        new_request_time = self.request_time + request_dif
+    def last_event(self) -> Event | None:
+        if self.current_event is None:
+            return None
+        return self.current_event.event
 
-        if new_entanglement_time < new_request_time:
-            self.entanglement_time = new_entanglement_time
-            self.entanglement_count += 1
-        else:
-            self.request_time = new_request_time
-            self.request_count += 1
+    def schedule(
+        self,
+        delay: float,
+        event: Event,
+        handler: Callable[[ScheduledEvent], None],
+        data: Any = None,
+    ) -> ScheduledEvent:
+        """Plant `event` in `delay` Sekunden ab jetzt ein."""
+        return self.schedule_at(self.current_time + delay, event, handler, data)
 
+    def schedule_at(
+        self,
+        time: float,
+        event: Event,
+        handler: Callable[[ScheduledEvent], None],
+        data: Any = None,
+    ) -> ScheduledEvent:
+        if time < self.current_time:
+            raise ValueError("Cannot schedule an event in the past")
+        scheduled = ScheduledEvent(time, next(self._sequence), event, handler, data)
+        heapq.heappush(self._queue, scheduled)
+        return scheduled
 
+    def pop(self) -> ScheduledEvent | None:
+        """Entnimmt das nächste Ereignis und stellt die Uhr darauf.
+        Gibt None zurück, wenn nichts mehr eingeplant ist."""
+        if not self._queue:
+            return None
+        scheduled = heapq.heappop(self._queue)
+        self.current_time = scheduled.time
+        self.current_event = scheduled
+        return scheduled
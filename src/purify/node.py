@@ -1,44 +1,111 @@
 import logging
+from collections import deque
+from collections.abc import Callable
 
-import numpy as np
-
-from purify import ConstantsTuple
-from purify.entanglement import Entanglement
+from purify.constants_tuple import ConstantsTuple
+from purify.entanglement import Entanglement, EntanglementState
+from purify.memory import Memory
 from purify.my_constants import (
+    LAMBDA_1,
+    LAMBDA_2,
+    LAMBDA_3,
     P_G,
 )
-from purify.my_enums import LambdaSrategy, Strategy
+from purify.my_enums import Action, LambdaSrategy, Protocol, Strategy
 from purify.my_time import Time
+from purify.profiler import Profiler
 from purify.qubit import Qubit
+from purify.trace import NO_STATE, Tracer
 from purify.utils.bernouli_util import bernouli_with_probability_is_successfull
 from purify.utils.csv_utils import write_results_csv
-from purify.utils.purification_util import Purification
+from purify.utils.purification_table_util import PurificationTable
+from purify.utils.purification_util import PURIFICATION_FUNCTIONS
+from purify.utils.random_util import RandomStream
 
 logger = logging.getLogger(__name__)
-rng = np.random.default_rng()
+
+# Strategien, die good memory mit dem neuen Paar pumpen
+PUMPING_STRATEGIES = (
+    Strategy.ALWAYS_PROT_1,
+    Strategy.ALWAYS_PROT_2,
+    Strategy.ALWAYS_PROT_3,
+    Strategy.ALWAYS_PMD,
+    Strategy.ALWAYS_PROT_1_WITH_PROBABILITY,
+    Strategy.ALWAYS_PROT_2_WITH_PROBABILITY,
+    Strategy.ALWAYS_PROT_3_WITH_PROBABILITY,
+)
 
 
 class Node:
-    def __init__(self, time: Time, constants: ConstantsTuple) -> None:
+    def __init__(
+        self,
+        time: Time,
+        constants: ConstantsTuple,
+        write_result: Callable[
+            [float, float, ConstantsTuple], None
+        ] = write_results_csv,
+        rng: RandomStream | None = None,
+        tracer: Tracer | None = None,
+        purification_table: PurificationTable | None = None,
+        profiler: Profiler | None = None,
+        lambdas: tuple[float, float, float] | None = None,
+    ) -> None:
         self.time = time
-        self.good_memory: Entanglement | None = None
-        self.bad_memory: Entanglement | None = None
-        self.queue: Qubit | None = None
+        # lambdas neuer Paare bei USE_CONSTANTS (Standard: my_constants)
+        self.lambdas: tuple[float, float, float] = (
+            lambdas if lambdas is not None else (LAMBDA_1, LAMBDA_2, LAMBDA_3)
+        )
+        # optional: tabellierte Pump-Funktionen (nur für USE_CONSTANTS)
+        self.purification_table = purification_table
+        self.rng: RandomStream = rng if rng is not None else RandomStream()
+        self.tracer: Tracer | None = tracer
+        # optional: Zähler für Pump-Versuche, verworfene Anfragen usw.
+        self.profiler: Profiler | None = profiler
+        if constants.queue_capacity < 1:
+            raise ValueError("queue_capacity must be at least 1")
+        # constants.memory_slots Speicherplätze, nach Fidelity sortiert
+        self.memory = Memory(constants.memory_slots)
+        # wartende Anfragen, die älteste zuerst
+        self.queue: deque[Qubit] = deque()
         self.constants: ConstantsTuple = constants
+        # wird für jede bediente Anfrage mit (fidelity, waiting_time, constants)
+        # aufgerufen
+        self.write_result = write_result
+
+    @property
+    def good_memory(self) -> Entanglement | None:
+        """Das Paar mit der höchsten Fidelity."""
+        return self.memory.best()
+
+    @property
+    def bad_memory(self) -> Entanglement | None:
+        """Das Paar mit der zweithöchsten Fidelity."""
+        return self.memory.second()
 
     "is called, when event entanglement_generation happend"
 
-    def handle_entanglement_generation(self) -> None:
-        entanglement: Entanglement | None = self.__generate_entanglement()
+    def handle_entanglement_generation(self, successful: bool | None = None) -> str:
+        """`successful` gibt das Ergebnis des Erzeugungsversuchs vor (z.B. wenn
+        die Simulation fehlgeschlagene Versuche überspringt), sonst wird mit P_G
+        gewürfelt. Gibt den durchlaufenen Zweig zurück ("failed", "stored" oder
+        den Namen der Strategie), für den Profiler."""
+        entanglement: Entanglement | None = self.__generate_entanglement(successful)
 
         # generation was not successful
         if entanglement is None:
-            return
+            return "failed"
 
-        # good memory was empty. Just place new entanglement in good memory
-        if self.good_memory is None:
-            self.good_memory = entanglement
-            return
+        # good memory was empty. Just place new entanglement in good memory.
+        # Pumping strategies keep filling free slots as long as one slot is
+        # left for the pair produced by pumping.
+        if len(self.memory) == 0 or (
+            self.constants.strategy in PUMPING_STRATEGIES
+            and len(self.memory) < self.memory.capacity - 1
+        ):
+            self.memory.add(entanglement)
+            if self.tracer is not None:
+                self.__trace(Action.STORED, entanglement.snapshot())
+            return "stored"
 
         match self.constants.strategy:
             case Strategy.ALWAYS_REPLACE:
@@ -57,181 +124,165 @@ class Node:
                 self.strategy_always_prot_2_with_probbility(entanglement)
             case Strategy.ALWAYS_PROT_3_WITH_PROBABILITY:
                 self.strategy_always_prot_3_with_probbility(entanglement)
+        return self.constants.strategy.name
 
     def strategy_always_prot_1_with_probbility(self, new_entanglement: Entanglement):
-        if self.good_memory is None:
-            raise Exception("Cannot pump without Entanglement")
         self.sometimes_prot_x_helper(
-            Purification.prot_1_success_probability(self.good_memory, new_entanglement),
-            Purification.prot_1_jump_function(self.good_memory, new_entanglement),
+            *self.__pumping(Protocol.PROT_1, new_entanglement)
         )
 
     def strategy_always_prot_2_with_probbility(self, new_entanglement: Entanglement):
-        if self.good_memory is None:
-            raise Exception("Cannot pump without Entanglement")
         self.sometimes_prot_x_helper(
-            Purification.prot_2_success_probability(self.good_memory, new_entanglement),
-            Purification.prot_2_jump_function(self.good_memory, new_entanglement),
+            *self.__pumping(Protocol.PROT_2, new_entanglement)
         )
 
     def strategy_always_prot_3_with_probbility(self, new_entanglement: Entanglement):
-        if self.good_memory is None:
-            raise Exception("Cannot pump without Entanglement")
         self.sometimes_prot_x_helper(
-            Purification.prot_3_success_probability(self.good_memory, new_entanglement),
-            Purification.prot_3_jump_function(self.good_memory, new_entanglement),
+            *self.__pumping(Protocol.PROT_3, new_entanglement)
         )
 
     def strategy_always_prot_1(self, new_entanglement: Entanglement):
-        if self.good_memory is None:
-            raise Exception("Cannot pump without Entanglement")
         self.always_prot_x_helper(
-            Purification.prot_1_success_probability(self.good_memory, new_entanglement),
-            Purification.prot_1_jump_function(self.good_memory, new_entanglement),
+            *self.__pumping(Protocol.PROT_1, new_entanglement)
         )
 
     def strategy_always_prot_2(self, new_entanglement: Entanglement):
-        if self.good_memory is None:
-            raise Exception("Cannot pump without Entanglement")
         self.always_prot_x_helper(
-            Purification.prot_2_success_probability(self.good_memory, new_entanglement),
-            Purification.prot_2_jump_function(self.good_memory, new_entanglement),
+            *self.__pumping(Protocol.PROT_2, new_entanglement)
         )
 
     def strategy_always_prot_3(self, new_entanglement: Entanglement):
-        if self.good_memory is None:
-            raise Exception("Cannot pump without Entanglement")
         self.always_prot_x_helper(
-            Purification.prot_3_success_probability(self.good_memory, new_entanglement),
-            Purification.prot_3_jump_function(self.good_memory, new_entanglement),
+            *self.__pumping(Protocol.PROT_3, new_entanglement)
         )
 
     def strategy_always_pmd(self, new_entanglement: Entanglement):
-        if self.good_memory is None:
-            raise Exception("Cannot pump without Entanglement")
         self.always_prot_x_helper(
-            Purification.pmd_success_probability(self.good_memory, new_entanglement),
-            Purification.pmd_jump_function(self.good_memory, new_entanglement),
+            *self.__pumping(Protocol.PMD, new_entanglement)
         )
 
-    def strategy_always_replace(self, entanglement) -> None:
-        if (
-            self.good_memory is None
-            or self.good_memory.get_current_fidelity()
-            < entanglement.get_current_fidelity()
-        ):
-            logger.info(
-                "Updated good-memory. Old value: "
-                + str(
-                    self.good_memory.get_current_fidelity()
-                    if self.good_memory is not None
-                    else None
-                )
-                + ", new value: "
-                + str(entanglement.get_current_fidelity())
+    def __pumping(
+        self, protocol: Protocol, new_entanglement: Entanglement
+    ) -> tuple[float, float]:
+        """(Erfolgswahrscheinlichkeit, Fidelity nach dem Pumpen) von good memory
+        mit dem neuen Paar, aus der Tabelle oder direkt aus Purification."""
+        good_memory = self.good_memory
+        if good_memory is None:
+            raise Exception("Cannot pump without Entanglement")
+        if self.purification_table is not None:
+            return self.purification_table.lookup(
+                protocol, good_memory.get_current_fidelity()
             )
-            self.good_memory = entanglement
+
+        # Zustand beider Paare, einmal pro Ereignis berechnet
+        good, bad = good_memory.snapshot(), new_entanglement.snapshot()
+        success_probability, jump_function = PURIFICATION_FUNCTIONS[protocol]
+        return success_probability(good, bad), jump_function(good, bad)
+
+    def strategy_always_replace(self, entanglement) -> None:
+        new_fidelity = entanglement.get_current_fidelity()
+        good = self.memory.best()
+        if good is None or good.get_current_fidelity() < new_fidelity:
+            self.memory.replace_best(entanglement)
+            action = Action.REPLACED_GOOD
+        elif not self.memory.is_full():
+            self.memory.add(entanglement)
+            action = Action.REPLACED_BAD
+        elif self.memory.worst().get_current_fidelity() < new_fidelity:
+            self.memory.replace_worst(entanglement)
+            action = Action.REPLACED_BAD
         else:
-            if (
-                self.bad_memory is None
-                or self.bad_memory.get_current_fidelity()
-                < entanglement.get_current_fidelity()
-            ):
-                logger.info(
-                    "Updated bad-memory. Old value: "
-                    + str(
-                        self.bad_memory.get_current_fidelity()
-                        if self.bad_memory is not None
-                        else None
-                    )
-                    + ", new value: "
-                    + str(entanglement.get_current_fidelity())
-                )
-                self.bad_memory = entanglement
+            action = Action.DISCARDED
+
+        if self.tracer is not None:
+            self.__trace(action, entanglement.snapshot())
 
     def sometimes_prot_x_helper(
         self, success_probability: float, fidelity_after_pumping: float
     ):
-        if bernouli_with_probability_is_successfull(self.constants.pumping_probability):
+        if bernouli_with_probability_is_successfull(
+            self.constants.pumping_probability, self.rng
+        ):
             self.always_prot_x_helper(success_probability, fidelity_after_pumping)
+        elif self.tracer is not None:
+            self.__trace(Action.DISCARDED)
 
     def always_prot_x_helper(
         self, success_probability: float, fidelity_after_pumping: float
     ):
-        if bernouli_with_probability_is_successfull(success_probability):
-            logger.info(
-                "Updated good-memory. Old value: "
-                + str(
-                    self.good_memory.get_current_fidelity()
-                    if self.good_memory is not None
-                    else None
-                )
-                + ", new value: "
-                + str(fidelity_after_pumping)
-                + " using strategy "
-                + self.constants.strategy.name
-            )
-
-            self.good_memory = Entanglement.from_fidelity(
+        # only the pumped pair changes, further slots keep their pairs
+        if self.profiler is not None:
+            self.profiler.count("pumps_attempted")
+        if bernouli_with_probability_is_successfull(success_probability, self.rng):
+            pumped = Entanglement.from_fidelity(
                 self.time, fidelity_after_pumping, self.constants.decoherence_time
             )
-            self.bad_memory = None
-            logger.info("purification was successfull")
+            self.memory.replace_best(pumped)
+            if self.profiler is not None:
+                self.profiler.count("pumps_succeeded")
+            if self.tracer is not None:
+                self.__trace(Action.PUMP_SUCCEEDED, pumped.snapshot())
 
         else:
-            self.good_memory = None
-            self.bad_memory = None
-            logger.info("Purification failed")
+            self.memory.pop_best()
+            if self.tracer is not None:
+                self.__trace(Action.PUMP_FAILED)
 
-    def __generate_entanglement(self) -> Entanglement | None:
-        generation_successful = bernouli_with_probability_is_successfull(P_G)
+    def __generate_entanglement(
+        self, successful: bool | None = None
+    ) -> Entanglement | None:
+        generation_successful = (
+            successful
+            if successful is not None
+            else bernouli_with_probability_is_successfull(P_G, self.rng)
+        )
         if generation_successful:
-            logger.info("Entanglement Generation Successful")
-
             match self.constants.lambda_strategy:
                 case LambdaSrategy.USE_CONSTANTS:
-                    return Entanglement.from_default_lambdas(
-                        self.time, self.constants.decoherence_time
+                    return Entanglement.from_lambdas(
+                        self.time, self.constants.decoherence_time, *self.lambdas
                     )
                 case LambdaSrategy.RANDOM_WITH_LARGEST_LAMBDA:
                     return Entanglement.from_random_with_biggest_lambda(
-                        self.time, self.constants.decoherence_time
+                        self.time, self.constants.decoherence_time, self.rng
                     )
         else:
-            logger.info("Entanglement Generation Failed")
+            if self.tracer is not None:
+                self.__trace(Action.GENERATION_FAILED)
             return None
 
     def handle_request_arrival(self):
-        # fill queue if empty
-        if self.queue is None:
-            self.queue = Qubit(self.time, self.constants)
+        # fill queue if not full
+        if len(self.queue) < self.constants.queue_capacity:
+            self.queue.append(Qubit(self.time, self.constants))
+            if self.tracer is not None:
+                self.__trace(Action.REQUEST_QUEUED)
         else:
             # if queue was already full, request is dropped
-            logger.info("Serving request failed. queue was already full")
+            if self.profiler is not None:
+                self.profiler.count("requests_dropped")
+            if self.tracer is not None:
+                self.__trace(Action.REQUEST_DROPPED)
 
     def serve_request(self):
-        if self.queue is None:
-            return
-
-        if self.good_memory is not None:
-            teleportation_fidelity: float = self.queue.teleportation_fidelity(
-                self.good_memory.get_current_fidelity()
-            )
-            logger.info(
-                "Served request with fidelity %s and waiting time %s. Initial qubit had fidelity: %s",
-                teleportation_fidelity,
-                self.queue.get_waiting_time(),
-                self.queue.get_current_fidelity(),
+        # serve the oldest requests first, each with the best pair left
+        while self.queue and len(self.memory):
+            qubit = self.queue.popleft()
+            teleportation_fidelity: float = qubit.teleportation_fidelity(
+                self.memory.pop_best().get_current_fidelity()
             )
-            write_results_csv(
-                teleportation_fidelity, self.queue.get_waiting_time(), self.constants
+            if self.tracer is not None:
+                # fidelity ist hier die Teleportations-Fidelity
+                self.__trace(
+                    Action.REQUEST_SERVED,
+                    NO_STATE._replace(fidelity=teleportation_fidelity),
+                )
+            self.write_result(
+                teleportation_fidelity, qubit.get_waiting_time(), self.constants
             )
 
-            # remove qubit from queue, because it was served
-            self.queue = None
-            # discard link in good_memory
-            self.good_memory = None
-            # put bad_memory entanglement in good_memory
-            if self.bad_memory is not None:
-                self.good_memory = self.bad_memory
-                self.bad_memory = None
+    def __trace(self, action: Action, state: EntanglementState = NO_STATE) -> None:
+        """Nur aufrufen, wenn ein Tracer gesetzt ist."""
+        self.tracer.record(
+            self.time.get_current_time(), self.time.last_event(), action, state
+        )
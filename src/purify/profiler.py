@@ -0,0 +1,164 @@
+import csv
+import logging
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+
+from purify.constants_tuple import ConstantsTuple
+
+logger = logging.getLogger(__name__)
+
+
+class _LoggingStart(logging.Handler):
+    """Erster Handler des Loggers `prefix`: versieht den Record mit der Startzeit."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        record.profiler_start = perf_counter()
+
+
+class _LoggingEnd(logging.Handler):
+    """
+    Letzter Handler der Logger-Hierarchie: bucht die Zeit seit _LoggingStart
+    auf die Phase "logging". Gibt es sonst keine Handler, übernimmt er die
+    Ausgabe von logging.lastResort, die durch die beiden Handler sonst
+    unterdrückt würde.
+    """
+
+    def __init__(self, profiler: "Profiler", last_resort: bool) -> None:
+        super().__init__()
+        self.profiler = profiler
+        self.last_resort = last_resort
+
+    def emit(self, record: logging.LogRecord) -> None:
+        last_resort = logging.lastResort
+        if (
+            self.last_resort
+            and last_resort is not None
+            and record.levelno >= last_resort.level
+        ):
+            last_resort.handle(record)
+        start = getattr(record, "profiler_start", None)
+        if start is not None:
+            self.profiler.add("logging", perf_counter() - start)
+
+
+class Profiler:
+    """
+    Wall-Time und Anzahl der Aufrufe pro Phase einer Simulation sowie
+    Zähler für Ereignisse wie Pump-Versuche. Wie beim Tracer prüfen
+    Simulation und Node nur `profiler is not None`; ohne Profiler entstehen
+    keine weiteren Kosten.
+
+    Phasen können verschachtelt sein: serve_request enthält write_result,
+    die Pump-Funktionen enthalten ihr logging.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: defaultdict[str, float] = defaultdict(float)
+        self.calls: Counter[str] = Counter()
+        self.counters: Counter[str] = Counter()
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.seconds[phase] += seconds
+        self.calls[phase] += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def call(self, phase: str, function: Callable, *args):
+        """Ruft `function` auf und bucht die Zeit auf `phase`."""
+        start = perf_counter()
+        result = function(*args)
+        self.add(phase, perf_counter() - start)
+        return result
+
+    def timed(self, phase: str, function: Callable) -> Callable:
+        """`function`, deren Aufrufe auf `phase` gebucht werden."""
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            result = function(*args, **kwargs)
+            self.add(phase, perf_counter() - start)
+            return result
+
+        return wrapper
+
+    @contextmanager
+    def timed_logging(self, prefix: str = "purify") -> Iterator[None]:
+        """
+        Bucht die Ausgabe aller Records der Logger unter `prefix` auf die
+        Phase "logging", solange der Kontext aktiv ist. Dazu wird ein Handler
+        vor die Handler von `prefix` und einer hinter die Handler des letzten
+        Loggers gesetzt, an den die Records weitergereicht werden. Gemessen
+        wird die Zeit der Handler; Records unterhalb des Log-Levels kosten
+        ohnehin fast nichts.
+        """
+        first = logging.getLogger(prefix)
+        last = first
+        handlers = list(first.handlers)
+        while last.propagate and last.parent is not None:
+            last = last.parent
+            handlers.extend(last.handlers)
+
+        start = _LoggingStart()
+        end = _LoggingEnd(self, last_resort=not handlers)
+        first.handlers.insert(0, start)
+        last.addHandler(end)
+        try:
+            yield
+        finally:
+            first.removeHandler(start)
+            last.removeHandler(end)
+
+    def merge(self, other: "Profiler") -> None:
+        for phase, seconds in other.seconds.items():
+            self.seconds[phase] += seconds
+        self.calls.update(other.calls)
+        self.counters.update(other.counters)
+
+    def report_rows(self) -> list[dict]:
+        """Eine Zeile pro Phase (nach Zeit absteigend), dann die Zähler."""
+        rows = [
+            {
+                "name": phase,
+                "calls": self.calls[phase],
+                "seconds": seconds,
+                "microseconds_per_call": 1e6 * seconds / self.calls[phase],
+            }
+            for phase, seconds in sorted(
+                self.seconds.items(), key=lambda item: -item[1]
+            )
+        ]
+        rows.extend(
+            {
+                "name": name,
+                "calls": count,
+                "seconds": None,
+                "microseconds_per_call": None,
+            }
+            for name, count in sorted(self.counters.items())
+        )
+        return rows
+
+
+def write_profile_report(
+    path: str | Path, profiles: dict[ConstantsTuple, Profiler]
+) -> None:
+    """Bericht pro ConstantsTuple als CSV, eine Zeile pro Phase bzw. Zähler."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fields = [
+        *ConstantsTuple._fields,
+        "name",
+        "calls",
+        "seconds",
+        "microseconds_per_call",
+    ]
+    with path.open(mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for constants, profiler in profiles.items():
+            for row in profiler.report_rows():
+                writer.writerow({**constants._asdict(), **row})
@@ -25,19 +25,26 @@ class Qubit:
         return current_fidelity
 
     def teleportation_fidelity(self, entanglement_fidelity: float) -> float:
-        Fe = float(np.clip(entanglement_fidelity, 0.0, 1.0))
-        Fq = float(np.clip(self.get_current_fidelity(), 0.0, 1.0))
+        return float(
+            teleportation_fidelity(entanglement_fidelity, self.get_current_fidelity())
+        )
 
-        # Terme aus der Gleichung
-        term1 = ((2.0 * Fe + 1.0) * Fq) / 3.0
-        term2 = (2.0 * (1.0 - Fe) * (1.0 - Fq)) / 3.0
+    def get_waiting_time(self):
+        return self._time.get_current_time() - self.creationTime
 
-        # numerisch stabile Berechnung der Wurzeln
-        a = np.sqrt(max(term1, 0.0))
-        b = np.sqrt(max(term2, 0.0))
 
-        FT = (a - b) ** 2
-        return float(np.clip(FT, 0.0, 1.0))
+def teleportation_fidelity(entanglement_fidelity, qubit_fidelity):
+    """Teleportations-Fidelity für Skalare oder ganze NumPy-Arrays."""
+    Fe = np.clip(entanglement_fidelity, 0.0, 1.0)
+    Fq = np.clip(qubit_fidelity, 0.0, 1.0)
 
-    def get_waiting_time(self):
-        return self._time.get_current_time() - self.creationTime
+    # Terme aus der Gleichung
+    term1 = ((2.0 * Fe + 1.0) * Fq) / 3.0
+    term2 = (2.0 * (1.0 - Fe) * (1.0 - Fq)) / 3.0
+
+    # numerisch stabile Berechnung der Wurzeln
+    a = np.sqrt(np.maximum(term1, 0.0))
+    b = np.sqrt(np.maximum(term2, 0.0))
+
+    FT = (a - b) ** 2
+    return np.clip(FT, 0.0, 1.0)
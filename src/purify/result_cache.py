@@ -0,0 +1,111 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+
+import purify.my_constants as my_constants
+from purify.constants_tuple import ConstantsTuple
+
+logger = logging.getLogger(__name__)
+
+# erhöhen, wenn sich das Simulationsmodell ändert und alte Ergebnisse
+# ungültig werden
+CACHE_VERSION = 1
+
+# Modulkonstanten, von denen die Ergebnisse abhängen
+MODULE_CONSTANTS = (
+    "P_G",
+    "DELTA_T",
+    "LAMBDA_1",
+    "LAMBDA_2",
+    "LAMBDA_3",
+    "ENTANGLEMENT_GENERATION_COUNT",
+    "QUBIT_ENTANGLEMENT_FACTOR",
+    "QUBIT_ARRIVAL_SCALE",
+)
+
+
+def _plain(value):
+    """JSON-taugliche Form von Enums und SeedSequences."""
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, np.random.SeedSequence):
+        return {"entropy": value.entropy, "spawn_key": list(value.spawn_key)}
+    return value
+
+
+def constants_digest(constants: ConstantsTuple) -> bytes:
+    """Inhaltsbasierter Hash einer Parameterkombination."""
+    data = {field: _plain(value) for field, value in constants._asdict().items()}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).digest()
+
+
+def point_seed(seed: np.random.SeedSequence, constants: ConstantsTuple):
+    """
+    Seed einer Parameterkombination, abgeleitet aus ihrem Inhalt statt aus
+    ihrer Position in der Liste. Ein zusätzlicher Punkt im Sweep ändert so die
+    Seeds (und Cache-Schlüssel) der übrigen Punkte nicht.
+    """
+    digest = constants_digest(constants)
+    spawn_key = tuple(
+        int.from_bytes(digest[i : i + 4], "little") for i in range(0, 16, 4)
+    )
+    return np.random.SeedSequence(seed.entropy, spawn_key=spawn_key)
+
+
+def cache_key(
+    constants: ConstantsTuple, seed: np.random.SeedSequence, options: dict
+) -> str:
+    """Schlüssel aus ConstantsTuple, Modulkonstanten, Seed und Optionen."""
+    data = {
+        "version": CACHE_VERSION,
+        "constants": {
+            field: _plain(value) for field, value in constants._asdict().items()
+        },
+        "module_constants": {
+            name: getattr(my_constants, name) for name in MODULE_CONSTANTS
+        },
+        "seed": _plain(seed),
+        "options": {name: _plain(value) for name, value in options.items()},
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Ergebnisse (fidelity, waiting_time) einzelner Parameterkombinationen als
+    .npz unter `directory`, benannt nach cache_key(). Dateien werden atomar
+    ersetzt, ein abgebrochener Sweep hinterlässt also nur fertige Punkte.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.npz"
+
+    def load(self, key: str) -> list[tuple[float, float]] | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                return list(zip(data["fidelity"].tolist(), data["time"].tolist()))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+    def store(self, key: str, results: list[tuple[float, float]]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rows = np.array(results, dtype=np.float64).reshape(-1, 2)
+        with tempfile.NamedTemporaryFile(
+            dir=path.parent, suffix=".tmp", delete=False
+        ) as f:
+            np.savez(f, fidelity=rows[:, 0], time=rows[:, 1])
+        os.replace(f.name, path)
@@ -0,0 +1,190 @@
+import csv
+import math
+from pathlib import Path
+
+import numpy as np
+
+from purify.constants_tuple import ConstantsTuple
+
+
+class RunningStatistics:
+    """Anzahl, Mittelwert und Varianz nach Welford, ohne die Werte zu speichern.
+    Zwei Instanzen lassen sich mit merge() exakt zusammenführen."""
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.mean: float = 0.0
+        self.m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningStatistics") -> None:
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        """Stichprobenvarianz (NaN bei weniger als zwei Werten)."""
+        if self.count < 2:
+            return math.nan
+        return self.m2 / (self.count - 1)
+
+    @property
+    def standard_error(self) -> float:
+        if self.count < 2:
+            return math.nan
+        return math.sqrt(self.variance / self.count)
+
+
+class Histogram:
+    """
+    Histogramm mit festen Bins als mergebare Quantil-Skizze. Bei `log=True`
+    sind die Bins logarithmisch zwischen `low` und `high`; Werte darunter
+    (z.B. Wartezeit 0) landen im Unterlauf-Bin, Werte darüber im Überlauf-Bin.
+    """
+
+    def __init__(self, low: float, high: float, bins: int, log: bool = False):
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.log = log
+        # [Unterlauf, bins..., Überlauf]
+        self.counts = np.zeros(bins + 2, dtype=np.int64)
+
+        self._start = math.log10(low) if log else low
+        self._width = ((math.log10(high) if log else high) - self._start) / bins
+
+    def add(self, value: float) -> None:
+        self.counts[self._index(value)] += 1
+
+    def _index(self, value: float) -> int:
+        if value < self.low or (self.log and value <= 0):
+            return 0
+        if value >= self.high:
+            # der obere Rand gehört noch zum letzten Bin
+            return self.bins if value == self.high else self.bins + 1
+        position = math.log10(value) if self.log else value
+        return min(int((position - self._start) / self._width), self.bins - 1) + 1
+
+    def merge(self, other: "Histogram") -> None:
+        if (other.low, other.high, other.bins, other.log) != (
+            self.low,
+            self.high,
+            self.bins,
+            self.log,
+        ):
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts += other.counts
+
+    def _edge(self, position: float) -> float:
+        return 10**position if self.log else position
+
+    def quantile(self, q: float) -> float:
+        """Quantil durch lineare Interpolation innerhalb des Bins."""
+        total = self.counts.sum()
+        if total == 0:
+            return math.nan
+
+        target = q * total
+        cumulative = np.cumsum(self.counts)
+        index = int(np.searchsorted(cumulative, target, side="left"))
+        if index == 0:
+            return 0.0 if self.log else self.low
+        if index == self.bins + 1:
+            return self.high
+
+        before = cumulative[index - 1]
+        fraction = (target - before) / self.counts[index] if self.counts[index] else 0.0
+        position = self._start + (index - 1 + fraction) * self._width
+        return self._edge(position)
+
+
+class ConfigurationStatistics:
+    """Statistik aller bedienten Anfragen einer Parameterkombination."""
+
+    def __init__(self) -> None:
+        self.fidelity = RunningStatistics()
+        self.waiting_time = RunningStatistics()
+        self.fidelity_histogram = Histogram(0.0, 1.0, 1000)
+        self.waiting_time_histogram = Histogram(1e-9, 1e3, 240, log=True)
+
+    def add(self, fidelity: float, waiting_time: float) -> None:
+        self.fidelity.add(fidelity)
+        self.waiting_time.add(waiting_time)
+        self.fidelity_histogram.add(fidelity)
+        self.waiting_time_histogram.add(waiting_time)
+
+    def merge(self, other: "ConfigurationStatistics") -> None:
+        self.fidelity.merge(other.fidelity)
+        self.waiting_time.merge(other.waiting_time)
+        self.fidelity_histogram.merge(other.fidelity_histogram)
+        self.waiting_time_histogram.merge(other.waiting_time_histogram)
+
+
+SUMMARY_QUANTILES = (0.01, 0.05, 0.5, 0.95, 0.99)
+
+
+class ResultsAggregator:
+    """
+    Online-Aggregation der Ergebnisse pro ConstantsTuple. write() hat die
+    Signatur von write_results_csv und kann daher direkt an Simulation
+    übergeben werden; statt Zeilen wird nur die Statistik behalten.
+    """
+
+    def __init__(self) -> None:
+        self.statistics: dict[ConstantsTuple, ConfigurationStatistics] = {}
+
+    def write(self, fidelity: float, time: float, my_constants: ConstantsTuple):
+        statistics = self.statistics.get(my_constants)
+        if statistics is None:
+            statistics = self.statistics[my_constants] = ConfigurationStatistics()
+        statistics.add(fidelity, time)
+
+    def merge(self, other: "ResultsAggregator") -> None:
+        for constants, statistics in other.statistics.items():
+            if constants in self.statistics:
+                self.statistics[constants].merge(statistics)
+            else:
+                self.statistics[constants] = statistics
+
+    def summary_rows(self) -> list[dict]:
+        """Eine Zeile pro Parameterkombination mit Mittelwerten, Varianzen
+        und Quantilen."""
+        rows = []
+        for constants, statistics in self.statistics.items():
+            row: dict = dict(constants._asdict())
+            row["count"] = statistics.fidelity.count
+            for name, running, histogram in (
+                ("fidelity", statistics.fidelity, statistics.fidelity_histogram),
+                (
+                    "time",
+                    statistics.waiting_time,
+                    statistics.waiting_time_histogram,
+                ),
+            ):
+                row[f"{name}_mean"] = running.mean
+                row[f"{name}_variance"] = running.variance
+                for q in SUMMARY_QUANTILES:
+                    row[f"{name}_q{round(q * 100):02d}"] = histogram.quantile(q)
+            rows.append(row)
+        return rows
+
+    def write_summary_csv(self, path: str | Path) -> None:
+        rows = self.summary_rows()
+        if not rows:
+            return
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open(mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
@@ -0,0 +1,249 @@
+import logging
+import os
+from collections.abc import Callable, Iterable
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from purify.constants_tuple import ConstantsTuple
+from purify.my_constants import (
+    DECOHERENCE_TIMES,
+    ENTANGLEMENT_GENERATION_COUNT,
+    LAMBDA_STRAT,
+    MEMORY_SLOTS,
+    PUMPING_PROBABILTIES,
+    QUEUE_CAPACITIES,
+    STRATEGIES,
+    WAITING_TIME_SENSIVITIES,
+)
+from purify.my_simulation import Simulation
+from purify.profiler import Profiler, write_profile_report
+from purify.result_cache import ResultCache, cache_key, point_seed
+from purify.timeline import Timeline
+from purify.trace import trace_path
+from purify.utils.csv_utils import write_results_csv
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_constants() -> list[ConstantsTuple]:
+    """Alle Parameterkombinationen aus my_constants in der bisherigen
+    Reihenfolge der verschachtelten Schleifen."""
+    return [
+        ConstantsTuple(
+            strategy=strategy,
+            decoherence_time=decoherence_time,
+            pumping_probability=pumping_probabily,
+            waiting_time_sensitivity=waiting_time_sensitivity,
+            lambda_strategy=lambda_strat,
+            memory_slots=memory_slots,
+            queue_capacity=queue_capacity,
+        )
+        for strategy in STRATEGIES
+        for decoherence_time in DECOHERENCE_TIMES
+        for pumping_probabily in PUMPING_PROBABILTIES
+        for waiting_time_sensitivity in WAITING_TIME_SENSIVITIES
+        for lambda_strat in LAMBDA_STRAT
+        for memory_slots in MEMORY_SLOTS
+        for queue_capacity in QUEUE_CAPACITIES
+    ]
+
+
+def run_constants(
+    constants: ConstantsTuple,
+    seed: np.random.SeedSequence,
+    skip_failed_generations: bool = False,
+    fidelity_half_width: float | None = None,
+    waiting_time_half_width: float | None = None,
+    min_generations: int = 10000,
+    max_generations: int = ENTANGLEMENT_GENERATION_COUNT,
+    purification_table: bool = False,
+    timeline: Timeline | None = None,
+    profiler: Profiler | None = None,
+    trace_file: str | Path | None = None,
+) -> list[tuple[float, float]]:
+    """Simuliert eine Parameterkombination und gibt alle bedienten Anfragen
+    als (fidelity, waiting_time) zurück. Mit `fidelity_half_width` endet die
+    Simulation, sobald das Konfidenzintervall schmal genug ist, spätestens
+    nach `max_generations` Erzeugungsversuchen. Mit `profiler` werden die
+    Phasen der Simulation gemessen und dort aufsummiert. Mit `trace_file`
+    werden die Records des Tracers dort gespeichert (siehe Tracer.save)."""
+    results: list[tuple[float, float]] = []
+
+    sim = Simulation(
+        constants,
+        write_result=lambda fidelity, time, _: results.append((fidelity, time)),
+        seed=seed,
+        skip_failed_generations=skip_failed_generations,
+        generation_count=max_generations,
+        purification_table=purification_table,
+        timeline=timeline,
+        profile=profiler is not None,
+        trace=trace_file is not None,
+    )
+    if fidelity_half_width is None:
+        sim.run()
+    else:
+        result = sim.run_until_precision(
+            fidelity_half_width,
+            waiting_time_half_width,
+            min_generations=min_generations,
+        )
+        logger.info(f"{constants}: {result}")
+    if profiler is not None:
+        profiler.merge(sim.profiler)
+    if trace_file is not None:
+        sim.tracer.save(trace_file)
+    return results
+
+
+# gemeinsame Zeitachse im Worker-Prozess, gesetzt vom Pool-Initializer
+_timeline: Timeline | None = None
+
+
+def _init_worker(timeline: Timeline | None) -> None:
+    global _timeline
+    _timeline = timeline
+
+
+def _run_task(
+    task: tuple[ConstantsTuple, np.random.SeedSequence, str | None],
+    cache: ResultCache | None = None,
+    profile: bool = False,
+    trace_dir: str | None = None,
+    **options,
+) -> tuple[list[tuple[float, float]], Profiler | None]:
+    constants, seed, key = task
+    # Profil und Trace brauchen einen echten Lauf, daher dann nicht aus dem Cache
+    if cache is not None and not profile and trace_dir is None:
+        results = cache.load(key)
+        if results is not None:
+            logger.info(f"{constants}: loaded from cache")
+            return results, None
+
+    profiler = Profiler() if profile else None
+    trace_file = trace_path(trace_dir, constants) if trace_dir is not None else None
+    results = run_constants(
+        constants,
+        seed,
+        timeline=_timeline,
+        profiler=profiler,
+        trace_file=trace_file,
+        **options,
+    )
+    if cache is not None:
+        cache.store(key, results)
+    return results, profiler
+
+
+def run_sweep(
+    constants_list: Iterable[ConstantsTuple],
+    workers: int | None = None,
+    seed: int | None = None,
+    write_result: Callable[[float, float, ConstantsTuple], None] = write_results_csv,
+    common_random_numbers: bool = False,
+    cache_dir: str | None = None,
+    profile_path: str | None = None,
+    trace_dir: str | None = None,
+    **options,
+) -> None:
+    """
+    Verteilt die Parameterkombinationen auf einen Prozess-Pool.
+    Jede Aufgabe bekommt einen eigenen Seed aus `seed`. Die Ergebnisse werden
+    in der Reihenfolge von `constants_list` geschrieben, unabhängig davon,
+    welcher Prozess zuerst fertig ist. `options` werden an run_constants
+    weitergegeben.
+
+    Mit `common_random_numbers` wird eine Timeline einmal gezogen und über den
+    Pool-Initializer an jeden Prozess übergeben; alle Aufgaben teilen sich
+    außerdem denselben Seed für die übrigen Zufallsentscheidungen.
+
+    Mit `cache_dir` wird jeder fertige Punkt unter einem Schlüssel aus
+    ConstantsTuple, Modulkonstanten, Seed und `options` abgelegt und bei einem
+    erneuten Lauf (oder nach einem Abbruch) nicht noch einmal simuliert. Die
+    Seeds der Punkte hängen dafür von ihrem Inhalt ab, nicht von ihrer
+    Position in `constants_list` (siehe point_seed).
+    Ohne `seed` bekäme jeder Lauf neue Schlüssel, die nie wieder getroffen
+    werden; der Cache ist dann abgeschaltet.
+
+    Mit `profile_path` wird jeder Punkt mit Profiler simuliert und am Ende ein
+    Bericht pro ConstantsTuple als CSV geschrieben (siehe write_profile_report).
+
+    Mit `trace_dir` wird jeder Punkt mit Tracer simuliert; jeder Prozess legt
+    die Records seiner Punkte dort als .npy ab (siehe trace_path).
+    """
+    if cache_dir is not None and seed is None:
+        logger.warning("Result cache disabled: it requires a seed")
+        cache_dir = None
+    cache = ResultCache(cache_dir) if cache_dir is not None else None
+    profiles: dict[ConstantsTuple, Profiler] = {}
+    if trace_dir is not None:
+        Path(trace_dir).mkdir(parents=True, exist_ok=True)
+    run_task = partial(
+        _run_task,
+        cache=cache,
+        profile=profile_path is not None,
+        trace_dir=trace_dir,
+        **options,
+    )
+    constants_list = list(constants_list)
+    base_seed = np.random.SeedSequence(seed)
+    timeline = None
+    if common_random_numbers:
+        timeline_seed, decision_seed = base_seed.spawn(2)
+        timeline = Timeline(
+            timeline_seed,
+            options.get("max_generations", ENTANGLEMENT_GENERATION_COUNT),
+        )
+        seeds = [decision_seed] * len(constants_list)
+    else:
+        seeds = [point_seed(base_seed, constants) for constants in constants_list]
+    if cache is not None:
+        key_options = dict(options, common_random_numbers=common_random_numbers)
+        keys = [
+            cache_key(constants, point, key_options)
+            for constants, point in zip(constants_list, seeds)
+        ]
+    else:
+        keys = [None] * len(constants_list)
+    tasks = list(zip(constants_list, seeds, keys))
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        _init_worker(timeline)
+        try:
+            results = map(run_task, tasks)
+            _merge_results(constants_list, results, write_result, profiles)
+        finally:
+            _init_worker(None)
+    else:
+        # nur im Hauptprozess gebraucht, Worker laden das Modul nicht
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(timeline,)
+        ) as executor:
+            # map() liefert in Eingabereihenfolge -> deterministisches Zusammenführen
+            results = executor.map(run_task, tasks)
+            _merge_results(constants_list, results, write_result, profiles)
+
+    if profile_path is not None:
+        write_profile_report(profile_path, profiles)
+        logger.warning(f"Profile written to {profile_path}")
+    if trace_dir is not None:
+        logger.warning(f"Traces written to {trace_dir}")
+
+
+def _merge_results(
+    constants_list: list[ConstantsTuple],
+    results: Iterable[tuple[list[tuple[float, float]], Profiler | None]],
+    write_result: Callable[[float, float, ConstantsTuple], None],
+    profiles: dict[ConstantsTuple, Profiler],
+) -> None:
+    for constants, (rows, profiler) in zip(constants_list, results):
+        logger.warning(f"Finished {constants}")
+        for fidelity, time in rows:
+            write_result(fidelity, time, constants)
+        if profiler is not None:
+            profiles.setdefault(constants, Profiler()).merge(profiler)
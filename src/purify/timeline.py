@@ -0,0 +1,56 @@
+import numpy as np
+
+from purify.my_constants import (
+    ENTANGLEMENT_GENERATION_COUNT,
+    P_G,
+    QUBIT_ARRIVAL_SCALE,
+    QUBIT_ENTANGLEMENT_FACTOR,
+)
+from purify.utils.random_util import RandomStream
+
+
+class Timeline:
+    """
+    Ereignisse, die weder von der Strategie noch von t_c abhängen: Ankünfte
+    der Anfragen und Ergebnisse der Erzeugungsversuche. Einmal gezogen und für
+    jede Parameterkombination wiederverwendet (Common Random Numbers), sind
+    Unterschiede zwischen Strategien nicht mehr vom Rauschen der Zeitachse
+    überlagert.
+    """
+
+    def __init__(
+        self,
+        seed=None,
+        generation_count: int = ENTANGLEMENT_GENERATION_COUNT,
+        antithetic: bool = False,
+    ) -> None:
+        rng = RandomStream(seed, antithetic=antithetic)
+        self.generation_count = generation_count
+        self.request_samples = rng.gamma(
+            shape=2,
+            scale=1 / QUBIT_ARRIVAL_SCALE,
+            size=round(generation_count / QUBIT_ENTANGLEMENT_FACTOR),
+        )
+
+        # Versuche bis einschließlich zum nächsten Erfolg, bis über alle
+        # generation_count Versuche hinaus (nach dem letzten Erfolg wird noch
+        # ein Wert gelesen)
+        blocks = []
+        total = 0
+        block_size = int(generation_count * P_G) + 16
+        while total <= generation_count:
+            block = rng.geometrics(P_G, block_size)
+            blocks.append(block)
+            total += int(block.sum())
+        self.attempts: list[int] = np.concatenate(blocks).tolist()
+
+        self._successful: np.ndarray | None = None
+
+    def successful(self) -> np.ndarray:
+        """Ergebnis jedes einzelnen Erzeugungsversuchs (Index = Versuch - 1)."""
+        if self._successful is None:
+            successes = np.cumsum(self.attempts) - 1
+            successful = np.zeros(self.generation_count, dtype=bool)
+            successful[successes[successes < self.generation_count]] = True
+            self._successful = successful
+        return self._successful
@@ -0,0 +1,73 @@
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+
+from purify.constants_tuple import ConstantsTuple
+from purify.entanglement import EntanglementState
+from purify.my_enums import Action, Event
+
+# Ein Record pro Aktion von Node; nicht belegte Werte sind NaN
+TRACE_DTYPE = np.dtype(
+    [
+        ("time", "f8"),
+        ("event", "u1"),
+        ("action", "u1"),
+        ("fidelity", "f8"),
+        ("lambda_1", "f8"),
+        ("lambda_2", "f8"),
+        ("lambda_3", "f8"),
+    ]
+)
+
+NO_STATE = EntanglementState(np.nan, np.nan, np.nan, np.nan)
+
+
+class Tracer:
+    """
+    Zeichnet typisierte Ereignis-Records (time, event, action, F, lambdas) in
+    einem wachsenden NumPy-Puffer auf, statt Log-Zeilen zu formatieren.
+    Ist kein Tracer gesetzt (Standard), prüfen Simulation und Node nur
+    `tracer is not None` und es entstehen keine weiteren Kosten.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self._records = np.empty(capacity, dtype=TRACE_DTYPE)
+        self._size = 0
+
+    def record(
+        self,
+        time: float,
+        event: Event | None,
+        action: Action,
+        state: EntanglementState = NO_STATE,
+    ) -> None:
+        if self._size == len(self._records):
+            self._records = np.resize(self._records, 2 * len(self._records))
+        self._records[self._size] = (
+            time,
+            event.value if event is not None else 0,
+            action.value,
+            *state,
+        )
+        self._size += 1
+
+    def records(self) -> np.ndarray:
+        """Alle bisherigen Records als strukturiertes Array (ohne Kopie)."""
+        return self._records[: self._size]
+
+    def save(self, path: str | Path) -> None:
+        """Speichert die Records binär im .npy-Format."""
+        np.save(path, self.records())
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def trace_path(directory: str | Path, constants: ConstantsTuple) -> Path:
+    """Datei für den Trace einer Parameterkombination, z.B.
+    ALWAYS_PROT_1_0.01_1.0_1_USE_CONSTANTS_2_1.npy"""
+    name = "_".join(
+        value.name if isinstance(value, Enum) else str(value) for value in constants
+    )
+    return Path(directory) / f"{name}.npy"
@@ -1,21 +1,17 @@
 
 import logging
 
-import numpy as np
+from purify.utils.random_util import RandomStream
 
 logger = logging.getLogger(__name__)
 
 
-rng = np.random.default_rng()
+# nur für Aufrufe ohne eigene Zufallsquelle
+default_stream = RandomStream()
 
-def bernouli_with_probability_is_successfull(probability: float) -> bool:
+def bernouli_with_probability_is_successfull(
+    probability: float, rng: RandomStream | None = None
+) -> bool:
         if probability > 1:
             raise Exception("Probability must be smaller than 1")
-        success: bool = rng.choice(
-            [True, False],
-            p=[
-                probability,
-                1 - probability,
-            ],
-        )
-        return success
+        return (rng or default_stream).random() < probability
@@ -1,8 +1,10 @@
 from purify.utils.path_util import path_from_lambdas
 import csv
+import queue
+import threading
 from pathlib import Path
 
-from purify import ConstantsTuple
+from purify.constants_tuple import ConstantsTuple
 from purify.my_constants import LAMBDA_1, LAMBDA_2, LAMBDA_3
 
 
@@ -67,3 +69,79 @@ def write_results_csv(
     except Exception as e:
         print(f"Fehler beim Schreiben der Ergebnisse: {e}")
 
+
+class ResultsWriter:
+    """
+    Ersetzt write_results_csv für viele Zeilen: Die Ergebnisdatei bleibt offen,
+    Zeilen werden spaltenweise gepuffert und in großen Blöcken von einem
+    Hintergrund-Thread geschrieben, damit die Simulation nicht auf die Platte
+    wartet. Mit close() (oder als Context-Manager) werden alle Zeilen
+    geschrieben.
+    """
+
+    def __init__(self, path: str | Path | None = None, chunk_size: int = 10000):
+        self.path = Path(path if path is not None else path_from_lambdas())
+        self.chunk_size = chunk_size
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        file_empty = (
+            (self.path.stat().st_size == 0) if self.path.exists() else True
+        )
+        self._file = self.path.open(mode="a", newline="", encoding="utf-8")
+        self._writer = csv.writer(
+            self._file, delimiter=",", quotechar='"', quoting=csv.QUOTE_MINIMAL
+        )
+        if file_empty:
+            self._writer.writerow(["fidelity", "time", *ConstantsTuple._fields])
+
+        self._new_buffers()
+        self._chunks: queue.Queue = queue.Queue()
+        self._error: Exception | None = None
+        self._thread = threading.Thread(target=self._write_chunks, daemon=True)
+        self._thread.start()
+
+    def write(self, fidelity: float, time: float, my_constants: ConstantsTuple):
+        self._fidelities.append(fidelity)
+        self._times.append(time)
+        self._constants.append(my_constants)
+        if len(self._fidelities) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Übergibt die gepufferten Zeilen an den Hintergrund-Thread."""
+        if self._fidelities:
+            self._chunks.put((self._fidelities, self._times, self._constants))
+            self._new_buffers()
+
+    def close(self) -> None:
+        self.flush()
+        self._chunks.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _new_buffers(self) -> None:
+        self._fidelities: list[float] = []
+        self._times: list[float] = []
+        self._constants: list[ConstantsTuple] = []
+
+    def _write_chunks(self) -> None:
+        while (chunk := self._chunks.get()) is not None:
+            if self._error is not None:
+                continue
+            fidelities, times, constants = chunk
+            try:
+                self._writer.writerows(
+                    [fidelity, time, *values]
+                    for fidelity, time, values in zip(fidelities, times, constants)
+                )
+                self._file.flush()
+            except Exception as e:
+                self._error = e
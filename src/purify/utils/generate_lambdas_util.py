@@ -1,7 +1,10 @@
-import numpy.random as random
+from purify.utils.random_util import RandomStream
 
+# nur für Aufrufe ohne eigene Zufallsquelle
+default_stream = RandomStream()
 
-def generate_y_z(x, w):
+
+def generate_y_z(x, w, size=None, rng: RandomStream | None = None):
     # 1. Prüfen, ob w gültig ist
     if not (0 < w < 1):
         raise ValueError("w muss zwischen 0 und 1 liegen.")
@@ -23,7 +26,8 @@ def generate_y_z(x, w):
 
     # 4. y und z generieren
     # Wir teilen S einfach zufällig auf y und z auf.
-    y = random.uniform(0.0001, S - 0.0001) # Kleiner Puffer, um 0 zu vermeiden
+    # Kleiner Puffer, um 0 zu vermeiden
+    y = (rng or default_stream).uniform(0.0001, S - 0.0001, size=size)
     z = S - y
     
     return y, z
\ No newline at end of file
@@ -1,8 +1,40 @@
 
 
 
+from pathlib import Path
+
 from purify.my_constants import LAMBDA_1, LAMBDA_2, LAMBDA_3
 
 
 def path_from_lambdas():
-    return f"ALL_RESULTS_{str(LAMBDA_1).replace(".", "")}_{str(LAMBDA_2).replace(".", "")}_{str(LAMBDA_3).replace(".", "")}.csv"
\ No newline at end of file
+    return f"ALL_RESULTS_{str(LAMBDA_1).replace(".", "")}_{str(LAMBDA_2).replace(".", "")}_{str(LAMBDA_3).replace(".", "")}.csv"
+
+
+def summary_path_from_lambdas():
+    return str(summary_path_from_results_path(path_from_lambdas()))
+
+
+def summary_path_from_results_path(path) -> Path:
+    """Zusammenfassung zu einer Ergebnisdatei: "ALL_RESULTS_00_02_01.csv" ->
+    "SUMMARY_00_02_01.csv" im selben Verzeichnis."""
+    path = Path(path)
+    return path.with_name(path.name.replace("ALL_RESULTS_", "SUMMARY_", 1))
+
+
+def lambdas_from_path(path) -> tuple[float, float, float] | None:
+    """Umkehrung von path_from_lambdas bzw. summary_path_from_lambdas:
+    "ALL_RESULTS_00_02_01.csv" -> (0.0, 0.2, 0.1)."""
+    stem = Path(path).stem
+    for prefix in ("ALL_RESULTS_", "SUMMARY_"):
+        if stem.startswith(prefix):
+            parts = stem.removeprefix(prefix).split("_")
+            break
+    else:
+        return None
+    if len(parts) != 3:
+        return None
+    try:
+        # path_from_lambdas entfernt den Punkt, alle Lambdas sind kleiner 1
+        return tuple(float(f"{part[0]}.{part[1:] or 0}") for part in parts)
+    except ValueError:
+        return None
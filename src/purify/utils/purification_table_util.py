@@ -0,0 +1,109 @@
+import logging
+
+import numpy as np
+
+from purify.entanglement import EntanglementState
+from purify.my_constants import LAMBDA_1, LAMBDA_2, LAMBDA_3
+from purify.my_enums import Protocol
+from purify.utils.purification_util import PURIFICATION_FUNCTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class PurificationTable:
+    """
+    Tabellierte Erfolgswahrscheinlichkeit und Jump-Funktion für ein festes
+    neues Paar `fresh` (USE_CONSTANTS). Das neue Paar wird direkt bei seiner
+    Erzeugung gepumpt, hängt also nur noch von F_good ab; die Tabelle ist ein
+    gleichmäßiges Gitter über F_good in [0, 1] mit linearer Interpolation.
+
+    Das Gitter wird pro Protokoll so lange verdoppelt, bis der Fehler in den
+    Intervallmitten höchstens `max_error` ist. Die Erfolgswahrscheinlichkeit
+    ist linear in F_good und damit exakt, die Jump-Funktion ist rational mit
+    festem Vorzeichen der zweiten Ableitung, der Fehler ist in der Mitte eines
+    Intervalls am größten.
+    """
+
+    def __init__(
+        self,
+        fresh: EntanglementState,
+        max_error: float = 1e-9,
+        max_points: int = 1 << 20,
+    ) -> None:
+        self.fresh = fresh
+        self.max_error = max_error
+        self.max_points = max_points
+        # Protocol -> (Schrittweite^-1, Erfolgswahrscheinlichkeiten, Jumps)
+        self._tables: dict[Protocol, tuple[float, list[float], list[float]]] = {}
+        # gemessener Interpolationsfehler pro Protokoll
+        self.errors: dict[Protocol, float] = {}
+
+    @classmethod
+    def from_default_lambdas(cls, max_error: float = 1e-9) -> "PurificationTable":
+        """Tabelle für neue Paare wie Entanglement.from_default_lambdas."""
+        return cls.from_lambdas(LAMBDA_1, LAMBDA_2, LAMBDA_3, max_error)
+
+    @classmethod
+    def from_lambdas(
+        cls,
+        lambda_1: float,
+        lambda_2: float,
+        lambda_3: float,
+        max_error: float = 1e-9,
+    ) -> "PurificationTable":
+        """Tabelle für neue Paare wie Entanglement.from_lambdas."""
+        fresh = EntanglementState(
+            1.0 - (lambda_1 + lambda_2 + lambda_3), lambda_1, lambda_2, lambda_3
+        )
+        return cls(fresh, max_error)
+
+    def _exact(self, protocol: Protocol, fidelity: np.ndarray):
+        success_probability, jump_function = PURIFICATION_FUNCTIONS[protocol]
+        good = EntanglementState(fidelity, 0.0, 0.0, 0.0)
+        return (
+            success_probability(good, self.fresh),
+            jump_function(good, self.fresh),
+        )
+
+    def _build(self, protocol: Protocol) -> tuple[float, list[float], list[float]]:
+        intervals = 64
+        while True:
+            grid = np.linspace(0.0, 1.0, intervals + 1)
+            success, jump = self._exact(protocol, grid)
+            midpoints = (grid[:-1] + grid[1:]) / 2
+            exact_success, exact_jump = self._exact(protocol, midpoints)
+            error = max(
+                np.abs((success[:-1] + success[1:]) / 2 - exact_success).max(),
+                np.abs((jump[:-1] + jump[1:]) / 2 - exact_jump).max(),
+            )
+            if error <= self.max_error or intervals >= self.max_points:
+                break
+            intervals *= 2
+
+        if error > self.max_error:
+            logger.warning(
+                f"{protocol}: interpolation error {error} above {self.max_error}"
+            )
+        self.errors[protocol] = float(error)
+        table = (float(intervals), success.tolist(), jump.tolist())
+        self._tables[protocol] = table
+        return table
+
+    def lookup(self, protocol: Protocol, fidelity: float) -> tuple[float, float]:
+        """(Erfolgswahrscheinlichkeit, Fidelity nach dem Pumpen) für F_good."""
+        table = self._tables.get(protocol)
+        if table is None:
+            table = self._build(protocol)
+        scale, success, jump = table
+
+        position = fidelity * scale
+        if position <= 0.0:
+            return success[0], jump[0]
+        index = int(position)
+        if index >= scale:
+            return success[-1], jump[-1]
+        weight = position - index
+        return (
+            success[index] + weight * (success[index + 1] - success[index]),
+            jump[index] + weight * (jump[index + 1] - jump[index]),
+        )
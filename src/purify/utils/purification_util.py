@@ -1,112 +1,143 @@
 import logging
-from purify.entanglement import Entanglement
+
+import numpy as np
+
+from purify.entanglement import EntanglementState
+from purify.my_enums import Protocol
 
 
 logger = logging.getLogger(__name__)
 
 
 """Assumes that e_good is in a Werner-State. As every Bell-Diagonal-State can be
-transformed into a Werner-State using twirling, the lambdas can just be ignored"""
+transformed into a Werner-State using twirling, the lambdas can just be ignored.
+All functions take EntanglementState snapshots (see Entanglement.snapshot()),
+so every value is evaluated only once per event.
+The fields may also be broadcastable NumPy arrays; every function then works
+elementwise and returns an array of the broadcast shape (see purify.jump_maps)."""
 
 
 class Purification:
-    def prot_1_jump_function(e_good: Entanglement, e_bad: Entanglement):
+    def check_pmd(e_bad: EntanglementState):
+        # np.any, damit auch Arrays von lambdas geprüft werden
+        if np.any(e_bad.lambda_2 != 0) or np.any(e_bad.lambda_3 != 0):
+            raise Exception("pmd can only be used if lambda 2 and 3 are equal to 0")
+
+    def prot_1_jump_function(e_good: EntanglementState, e_bad: EntanglementState):
         oben = (
-            4 * e_bad.get_current_lambda_1()
-            + 3 * e_bad.get_current_lambda_2()
-            + 3 * e_bad.get_current_lambda_3()
+            4 * e_bad.lambda_1
+            + 3 * e_bad.lambda_2
+            + 3 * e_bad.lambda_3
             - 3
-        ) * e_good.get_current_fidelity() - e_bad.get_current_lambda_1()
+        ) * e_good.fidelity - e_bad.lambda_1
 
         unten = (
-            (4 * e_bad.get_current_lambda_2() + 4 * e_bad.get_current_lambda_3() - 2)
-            * e_good.get_current_fidelity()
-            - e_bad.get_current_lambda_2()
-            - e_bad.get_current_lambda_3()
+            (4 * e_bad.lambda_2 + 4 * e_bad.lambda_3 - 2)
+            * e_good.fidelity
+            - e_bad.lambda_2
+            - e_bad.lambda_3
             - 1
         )
         return oben / unten
 
-    def prot_1_success_probability(e_good: Entanglement, e_bad: Entanglement):
+    def prot_1_success_probability(e_good: EntanglementState, e_bad: EntanglementState):
         base = (2 / 3) * (
-            1 - 2 * e_bad.get_current_lambda_2() - 2 * e_bad.get_current_lambda_3()
-        ) * e_good.get_current_fidelity() + (1 / 3) * (
-            1 + e_bad.get_current_lambda_2() + e_bad.get_current_lambda_3()
+            1 - 2 * e_bad.lambda_2 - 2 * e_bad.lambda_3
+        ) * e_good.fidelity + (1 / 3) * (
+            1 + e_bad.lambda_2 + e_bad.lambda_3
         )
         logger.info("Success probability is %s", base)
         return base
 
-    def prot_2_jump_function(e_good: Entanglement, e_bad: Entanglement):
+    def prot_2_jump_function(e_good: EntanglementState, e_bad: EntanglementState):
         oben = (
-            3 * e_bad.get_current_lambda_1()
-            + 4 * e_bad.get_current_lambda_2()
-            + 3 * e_bad.get_current_lambda_3()
+            3 * e_bad.lambda_1
+            + 4 * e_bad.lambda_2
+            + 3 * e_bad.lambda_3
             - 3
-        ) * e_good.get_current_fidelity() - e_bad.get_current_lambda_2()
+        ) * e_good.fidelity - e_bad.lambda_2
         unten = (
-            (4 * e_bad.get_current_lambda_1() + 4 * e_bad.get_current_lambda_3() - 2)
-            * e_good.get_current_fidelity()
-            - e_bad.get_current_lambda_1()
-            - e_bad.get_current_lambda_3()
+            (4 * e_bad.lambda_1 + 4 * e_bad.lambda_3 - 2)
+            * e_good.fidelity
+            - e_bad.lambda_1
+            - e_bad.lambda_3
             - 1
         )
         return oben / unten
 
-    def prot_2_success_probability(e_good: Entanglement, e_bad: Entanglement):
+    def prot_2_success_probability(e_good: EntanglementState, e_bad: EntanglementState):
         base = (2 / 3) * (
-            1 - 2 * e_bad.get_current_lambda_3() - 2 * e_bad.get_current_lambda_1()
-        ) * e_good.get_current_fidelity() + (1 / 3) * (
-            1 + e_bad.get_current_lambda_3() + e_bad.get_current_lambda_1()
+            1 - 2 * e_bad.lambda_3 - 2 * e_bad.lambda_1
+        ) * e_good.fidelity + (1 / 3) * (
+            1 + e_bad.lambda_3 + e_bad.lambda_1
         )
 
         logger.info("Success probability is %s", base)
         return base
 
-    def prot_3_jump_function(e_good: Entanglement, e_bad: Entanglement):
+    def prot_3_jump_function(e_good: EntanglementState, e_bad: EntanglementState):
         oben = (
-            3 * e_bad.get_current_lambda_1()
-            + 3 * e_bad.get_current_lambda_2()
-            + 4 * e_bad.get_current_lambda_3()
+            3 * e_bad.lambda_1
+            + 3 * e_bad.lambda_2
+            + 4 * e_bad.lambda_3
             - 3
-        ) * e_good.get_current_fidelity() - e_bad.get_current_lambda_3()
+        ) * e_good.fidelity - e_bad.lambda_3
         unten = (
-            (4 * e_bad.get_current_lambda_1() + 4 * e_bad.get_current_lambda_2() - 2)
-            * e_good.get_current_fidelity()
-            - e_bad.get_current_lambda_1()
-            - e_bad.get_current_lambda_2()
+            (4 * e_bad.lambda_1 + 4 * e_bad.lambda_2 - 2)
+            * e_good.fidelity
+            - e_bad.lambda_1
+            - e_bad.lambda_2
             - 1
         )
         return oben / unten
 
-    def prot_3_success_probability(e_good: Entanglement, e_bad: Entanglement):
+    def prot_3_success_probability(e_good: EntanglementState, e_bad: EntanglementState):
         base = (2 / 3) * (
-            1 - 2 * e_bad.get_current_lambda_1() - 2 * e_bad.get_current_lambda_2()
-        ) * e_good.get_current_fidelity() + (1 / 3) * (
-            1 + e_bad.get_current_lambda_1() + e_bad.get_current_lambda_2()
+            1 - 2 * e_bad.lambda_1 - 2 * e_bad.lambda_2
+        ) * e_good.fidelity + (1 / 3) * (
+            1 + e_bad.lambda_1 + e_bad.lambda_2
         )
 
         logger.info("Success probability is %s", base)
 
         return base
 
-    def pmd_jump_function(e_good: Entanglement, e_bad: Entanglement):
-        if e_bad.get_current_lambda_2() != 0 or e_bad.get_current_lambda_3() != 0:
-            raise Exception("pmd can only be used if lambda 2 and 3 are equal to 0")
-
+    def pmd_jump_function(e_good: EntanglementState, e_bad: EntanglementState):
+        Purification.check_pmd(e_bad)
 
         return (
-            e_bad.get_current_fidelity()
-            * e_good.get_current_fidelity()
+            e_bad.fidelity
+            * e_good.fidelity
             / Purification.pmd_success_probability(e_good, e_bad)
         )
 
-    def pmd_success_probability(e_good: Entanglement, e_bad: Entanglement):
-        if e_bad.get_current_lambda_2() != 0 or e_bad.get_current_lambda_3() != 0:
-            raise Exception("pmd can only be used if lambda 2 and 3 are equal to 0")
+    def pmd_success_probability(e_good: EntanglementState, e_bad: EntanglementState):
+        Purification.check_pmd(e_bad)
 
-        return e_bad.get_current_fidelity() * e_good.get_current_fidelity() + (
-            1 - e_bad.get_current_fidelity()
-        ) * (1 - e_good.get_current_fidelity())
+        return e_bad.fidelity * e_good.fidelity + (
+            1 - e_bad.fidelity
+        ) * (1 - e_good.fidelity)
 
 
 # https://gemini.google.com/app/210d72323b1ff2bc
+
+
+# Protocol -> (Erfolgswahrscheinlichkeit, Jump-Funktion)
+PURIFICATION_FUNCTIONS = {
+    Protocol.PROT_1: (
+        Purification.prot_1_success_probability,
+        Purification.prot_1_jump_function,
+    ),
+    Protocol.PROT_2: (
+        Purification.prot_2_success_probability,
+        Purification.prot_2_jump_function,
+    ),
+    Protocol.PROT_3: (
+        Purification.prot_3_success_probability,
+        Purification.prot_3_jump_function,
+    ),
+    Protocol.PMD: (
+        Purification.pmd_success_probability,
+        Purification.pmd_jump_function,
+    ),
+}
@@ -0,0 +1,115 @@
+import math
+from collections.abc import Iterator
+
+import numpy as np
+
+BLOCK_SIZE = 65536
+# größte Uniform aus Generator.random(): 1 - 2^-53
+LARGEST_UNIFORM = 1.0 - 2.0**-53
+
+
+class RandomStream:
+    """
+    Zufallsquelle einer Simulation. Hält einen explizit geseedeten Generator
+    und zieht Uniforms blockweise, damit einzelne Bernoulli-Entscheidungen
+    nur noch ein Listenzugriff und ein Vergleich sind. Gamma- und
+    Lambda-Samples werden aus denselben Uniforms gebildet.
+
+    Mit `antithetic` wird jede Uniform u durch ihr Spiegelbild ersetzt; zwei
+    Ströme mit gleichem Seed liefern dann negativ korrelierte Replikate. Die
+    Spiegelung an LARGEST_UNIFORM / 2 bildet das Gitter von Generator.random()
+    exakt auf sich selbst ab, 1 - u = 1 (und log1p(-1)) kommt also nicht vor.
+    Nicht ganzzahlige Gamma-Shapes laufen über den Generator und werden nicht
+    gespiegelt.
+    """
+
+    def __init__(
+        self, seed=None, block_size: int = BLOCK_SIZE, antithetic: bool = False
+    ) -> None:
+        self.generator = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.antithetic = antithetic
+        self._block: list[float] = []
+        self._index = 0
+
+    def random(self) -> float:
+        """Eine Uniform aus [0, 1)."""
+        if self._index >= len(self._block):
+            self._block = self.randoms(self.block_size).tolist()
+            self._index = 0
+        u = self._block[self._index]
+        self._index += 1
+        return u
+
+    def randoms(self, size) -> np.ndarray:
+        """`size` Uniforms aus [0, 1) als Array."""
+        if self.antithetic:
+            return LARGEST_UNIFORM - self.generator.random(size)
+        return self.generator.random(size)
+
+    def bernoulli(self, probability: float) -> bool:
+        return self.random() < probability
+
+    def geometric(self, probability: float) -> int:
+        """Anzahl der Versuche bis einschließlich zum ersten Erfolg."""
+        if probability >= 1:
+            return 1
+        u = self.random()
+        return int(math.log1p(-u) / math.log1p(-probability)) + 1
+
+    def geometrics(self, probability: float, size) -> np.ndarray:
+        """Wie geometric(), aber `size` Werte als Array."""
+        if probability >= 1:
+            return np.ones(size, dtype=np.int64)
+        u = self.randoms(size)
+        return (np.log1p(-u) / math.log1p(-probability)).astype(np.int64) + 1
+
+    def uniform(self, low: float = 0.0, high: float = 1.0, size=None):
+        if size is None:
+            return low + (high - low) * self.random()
+        return low + (high - low) * self.randoms(size)
+
+    def split(self, count: int) -> "RandomStream":
+        """
+        Neuer Strom über die nächsten `count` Uniforms des Generators; dieser
+        Strom überspringt sie mit BitGenerator.advance. Der neue Strom liefert
+        also genau die Werte, die randoms(count) hier geliefert hätte, ohne
+        dass sie vorab gespeichert werden.
+        """
+        bit_generator = self.generator.bit_generator
+        if not hasattr(bit_generator, "advance"):
+            raise ValueError(f"{type(bit_generator).__name__} cannot be advanced")
+        child = RandomStream(block_size=self.block_size, antithetic=self.antithetic)
+        child.generator.bit_generator.state = bit_generator.state
+        bit_generator.advance(count)
+        return child
+
+    def gammas(
+        self, shape: int, scale: float, count: int, block_size: int | None = None
+    ) -> Iterator[float]:
+        """
+        `count` Erlang-Samples in derselben Reihenfolge wie
+        gamma(shape, scale, count), aber in Blöcken fester Größe erzeugt: der
+        Speicherbedarf hängt nicht von `count` ab.
+        """
+        block_size = block_size or self.block_size
+        while count > 0:
+            size = min(count, block_size)
+            yield from self.gamma(shape, scale, size).tolist()
+            count -= size
+
+    def gamma(self, shape: float, scale: float = 1.0, size=None):
+        """
+        Gamma-Verteilung. Für ganzzahlige `shape` (Erlang-Verteilung) als Summe
+        von `shape` Exponentialverteilungen aus Uniforms, sonst über den
+        Generator.
+        """
+        if shape != int(shape) or shape < 1:
+            return self.generator.gamma(shape, scale, size)
+
+        shape = int(shape)
+        if size is None:
+            return -scale * sum(math.log1p(-self.random()) for _ in range(shape))
+
+        uniforms = self.randoms((*np.atleast_1d(size), shape))
+        return -scale * np.log1p(-uniforms).sum(axis=-1)
@@ -0,0 +1,198 @@
+import logging
+import math
+from statistics import NormalDist
+from typing import NamedTuple
+
+import numpy as np
+
+from purify.analytic_solver import AnalyticResult, solve
+from purify.constants_tuple import ConstantsTuple
+from purify.my_constants import ENTANGLEMENT_GENERATION_COUNT
+from purify.my_enums import Strategy
+from purify.my_simulation import Simulation
+from purify.statistics import RunningStatistics
+from purify.timeline import Timeline
+
+logger = logging.getLogger(__name__)
+
+
+class VarianceReducedEstimate(NamedTuple):
+    constants: ConstantsTuple
+    fidelity: float
+    fidelity_half_width: float
+    # gewöhnliches Monte Carlo aus den nicht gespiegelten Replikaten
+    plain_fidelity: float
+    plain_fidelity_half_width: float
+    # Erwartungswert der Kontrollvariable und dessen Diskretisierungsfehler
+    control_fidelity: float | None
+    control_fidelity_error: float | None
+    beta: float
+    # Varianz mal Aufwand (Erzeugungsversuche) im Vergleich zu plain
+    speedup: float
+    replicas: int
+    generation_attempts: int
+
+
+def _replica_fidelity(
+    constants: ConstantsTuple,
+    timeline: Timeline,
+    seed: np.random.SeedSequence,
+    antithetic: bool,
+) -> float:
+    """Mittlere Fidelity der bedienten Anfragen eines Replikats."""
+    fidelity = RunningStatistics()
+    Simulation(
+        constants,
+        write_result=lambda teleportation_fidelity, *_: fidelity.add(
+            teleportation_fidelity
+        ),
+        seed=seed,
+        skip_failed_generations=True,
+        generation_count=timeline.generation_count,
+        timeline=timeline,
+        antithetic=antithetic,
+    ).run()
+    return fidelity.mean if fidelity.count else math.nan
+
+
+def _replica_seeds(
+    pair_seed: np.random.SeedSequence, antithetic: bool
+) -> list[tuple[np.random.SeedSequence, np.random.SeedSequence, bool]]:
+    """
+    (timeline_seed, decision_seed, mirrored) der beiden Replikate eines
+    Paares. Antithetisch teilen sie sich die Seeds und das zweite spiegelt
+    die Uniforms, sonst bekommt das zweite eigene Seeds und ist unabhängig.
+    """
+    timeline_seed, decision_seed = pair_seed.spawn(2)
+    if antithetic:
+        return [
+            (timeline_seed, decision_seed, False),
+            (timeline_seed, decision_seed, True),
+        ]
+    second_timeline_seed, second_decision_seed = pair_seed.spawn(2)
+    return [
+        (timeline_seed, decision_seed, False),
+        (second_timeline_seed, second_decision_seed, False),
+    ]
+
+
+def estimate_fidelity(
+    constants: ConstantsTuple,
+    pairs: int = 16,
+    generation_count: int = ENTANGLEMENT_GENERATION_COUNT,
+    seed=None,
+    antithetic: bool = True,
+    control_variate: bool = False,
+    confidence: float = 0.95,
+    analytic: AnalyticResult | None = None,
+) -> VarianceReducedEstimate:
+    """
+    Mittlere Teleportations-Fidelity aus 2 * `pairs` unabhängigen Replikaten
+    mit je `generation_count` Erzeugungsversuchen.
+
+    antithetic: das zweite Replikat eines Paares verwendet dieselben Seeds mit
+    gespiegelten Uniforms (Ankünfte, Erzeugungsversuche, Pump-Entscheidungen).
+    Beobachtung ist dann der Mittelwert des Paares.
+
+    control_variate: auf derselben Timeline mit demselben Seed läuft zusätzlich
+    ALWAYS_REPLACE, deren Erwartungswert analytic_solver.solve kennt. Der
+    Schätzer ist Y - beta * (C - E[C]) mit beta = Cov(Y, C) / Var(C) aus den
+    Beobachtungen. Der Diskretisierungsfehler des Solvers steckt nicht in der
+    halben Breite, sondern wird als control_fidelity_error ausgewiesen. Das
+    zusätzliche Replikat kostet ebenso viele Erzeugungsversuche, lohnt sich
+    also nur bei starker Korrelation mit ALWAYS_REPLACE. Für ALWAYS_REPLACE
+    selbst wäre der Schätzer einfach solve() ohne Monte-Carlo-Anteil, das wird
+    abgelehnt.
+
+    Ohne antithetic laufen beide Replikate eines Paares mit eigenen Seeds und
+    zählen als zwei unabhängige Beobachtungen.
+
+    speedup vergleicht Varianz mal Erzeugungsversuche pro Beobachtung mit
+    gewöhnlichem Monte Carlo, dessen Varianz aus den ersten (nicht
+    gespiegelten) Replikaten der Paare geschätzt wird.
+    """
+    if pairs < 2:
+        raise ValueError("pairs must be at least 2")
+
+    control_constants = constants._replace(strategy=Strategy.ALWAYS_REPLACE)
+    if control_variate and control_constants == constants:
+        raise ValueError(
+            "control_variate needs a target other than ALWAYS_REPLACE; "
+            "use analytic_solver.solve for ALWAYS_REPLACE"
+        )
+    if control_variate and analytic is None:
+        analytic = solve(control_constants)
+
+    observations = []
+    controls = []
+    plain = []
+    generation_attempts = 0
+    for pair_seed in np.random.SeedSequence(seed).spawn(pairs):
+        replicas = []
+        replica_controls = []
+        for timeline_seed, decision_seed, mirrored in _replica_seeds(
+            pair_seed, antithetic
+        ):
+            timeline = Timeline(timeline_seed, generation_count, antithetic=mirrored)
+            fidelity = _replica_fidelity(constants, timeline, decision_seed, mirrored)
+            generation_attempts += generation_count
+            control = math.nan
+            if control_variate:
+                control = _replica_fidelity(
+                    control_constants, timeline, decision_seed, mirrored
+                )
+                generation_attempts += generation_count
+            replicas.append(fidelity)
+            replica_controls.append(control)
+
+        plain.append(replicas[0])
+        if antithetic:
+            observations.append(sum(replicas) / 2)
+            controls.append(sum(replica_controls) / 2)
+        else:
+            observations.extend(replicas)
+            controls.extend(replica_controls)
+
+    observations = np.array(observations)
+    controls = np.array(controls)
+    plain = np.array(plain)
+
+    beta = 0.0
+    control_fidelity = None
+    control_fidelity_error = None
+    estimates = observations
+    if control_variate:
+        control_fidelity = analytic.fidelity
+        control_fidelity_error = analytic.fidelity_error
+        control_variance = controls.var(ddof=1)
+        if control_variance > 0:
+            beta = float(
+                np.cov(observations, controls, ddof=1)[0, 1] / control_variance
+            )
+            estimates = observations - beta * (controls - control_fidelity)
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    estimate_variance = estimates.var(ddof=1)
+    plain_variance = plain.var(ddof=1)
+
+    # Erzeugungsversuche pro Beobachtung
+    cost = generation_attempts / len(estimates)
+    if estimate_variance > 0:
+        speedup = plain_variance * generation_count / (estimate_variance * cost)
+    else:
+        speedup = math.inf
+    logger.info(f"{constants}: speedup {speedup:.2f}, beta {beta:.3f}")
+
+    return VarianceReducedEstimate(
+        constants=constants,
+        fidelity=float(estimates.mean()),
+        fidelity_half_width=float(z * math.sqrt(estimate_variance / len(estimates))),
+        plain_fidelity=float(plain.mean()),
+        plain_fidelity_half_width=float(z * math.sqrt(plain_variance / len(plain))),
+        control_fidelity=control_fidelity,
+        control_fidelity_error=control_fidelity_error,
+        beta=beta,
+        speedup=float(speedup),
+        replicas=2 * pairs,
+        generation_attempts=generation_attempts,
+    )
@@ -0,0 +1,75 @@
+import math
+import unittest
+
+import numpy as np
+
+from purify.chain_simulation import ChainSimulation, swap_fidelity
+from purify.constants_tuple import ConstantsTuple
+from purify.my_constants import LENGTH, C
+from purify.my_enums import LambdaSrategy, Strategy
+
+GENERATION_COUNT = 20_000
+
+
+def _constants(strategy: Strategy) -> ConstantsTuple:
+    return ConstantsTuple(strategy, 0.01, 1.0, 1, LambdaSrategy.USE_CONSTANTS)
+
+
+class SwapFidelityTest(unittest.TestCase):
+    def test_single_link_is_unchanged(self):
+        self.assertAlmostEqual(swap_fidelity(np.array([0.8])), 0.8)
+
+    def test_werner_parameters_multiply(self):
+        # p = (4F - 1) / 3 = 0.6 je Link
+        self.assertAlmostEqual(swap_fidelity(np.array([0.7, 0.7])), 0.25 + 0.75 * 0.36)
+
+    def test_perfect_links_stay_perfect(self):
+        self.assertAlmostEqual(swap_fidelity(np.ones(300)), 1.0)
+
+
+class ChainSimulationTest(unittest.TestCase):
+    def test_long_pumping_chain_serves_requests(self):
+        # Regressionstest: früher verwarfen fehlgeschlagene Pump-Versuche
+        # während des Wartens Paare, und 100 Links waren nie gleichzeitig belegt
+        chain = ChainSimulation(
+            _constants(Strategy.ALWAYS_PROT_1),
+            100,
+            seed=1,
+            generation_count=GENERATION_COUNT,
+        )
+        chain.run()
+        summary = chain.summary()
+
+        self.assertGreater(summary["requests"], 0)
+        self.assertEqual(summary["served"], summary["requests"])
+        self.assertGreaterEqual(summary["latency_mean"], 99 * LENGTH / C)
+        self.assertTrue(0.0 < summary["fidelity_mean"] < 1.0)
+
+    def test_single_link_matches_link_fidelity(self):
+        chain = ChainSimulation(
+            _constants(Strategy.ALWAYS_REPLACE),
+            1,
+            seed=1,
+            generation_count=GENERATION_COUNT,
+        )
+        chain.run()
+        summary = chain.summary()
+
+        self.assertEqual(summary["served"], summary["requests"])
+        self.assertEqual(summary["latency_mean"], 0.0)
+        self.assertGreater(summary["fidelity_mean"], 0.5)
+
+    def test_summary_is_nan_without_requests(self):
+        chain = ChainSimulation(
+            _constants(Strategy.ALWAYS_PROT_1), 10, seed=1, generation_count=0
+        )
+        chain.run()
+        summary = chain.summary()
+
+        self.assertEqual(summary["served"], 0)
+        self.assertTrue(math.isnan(summary["fidelity_mean"]))
+        self.assertTrue(math.isnan(summary["latency_mean"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import math
+import unittest
+
+from purify.entanglement import Entanglement
+from purify.memory import Memory, ordering_key
+from purify.my_time import Time
+
+DECOHERENCE_TIME = 1.0
+
+
+def _pair(time: Time, creation_time: float, fidelity: float) -> Entanglement:
+    lambda_value = (1 - fidelity) / 3
+    return Entanglement(
+        time,
+        creation_time,
+        fidelity,
+        lambda_value,
+        lambda_value,
+        lambda_value,
+        DECOHERENCE_TIME,
+    )
+
+
+class OrderingKeyTest(unittest.TestCase):
+    def test_key_follows_current_fidelity(self):
+        time = Time()
+        time.current_time = 1.0
+        # älteres Paar mit höherer Anfangs-Fidelity ist inzwischen schlechter
+        older = _pair(time, 0.0, 0.9)
+        newer = _pair(time, 1.0, 0.6)
+
+        self.assertLess(older.get_current_fidelity(), newer.get_current_fidelity())
+        self.assertLess(ordering_key(older), ordering_key(newer))
+
+    def test_fully_mixed_pair_is_worst(self):
+        self.assertEqual(ordering_key(_pair(Time(), 0.0, 0.25)), -math.inf)
+
+
+class MemoryTest(unittest.TestCase):
+    def setUp(self):
+        self.time = Time()
+        self.memory = Memory(3)
+        self.low = _pair(self.time, 0.0, 0.6)
+        self.middle = _pair(self.time, 0.0, 0.7)
+        self.high = _pair(self.time, 0.0, 0.8)
+
+    def test_empty_memory(self):
+        self.assertEqual(len(self.memory), 0)
+        self.assertIsNone(self.memory.best())
+        self.assertIsNone(self.memory.second())
+        self.assertIsNone(self.memory.worst())
+
+    def test_best_second_worst(self):
+        for pair in (self.middle, self.high, self.low):
+            self.memory.add(pair)
+
+        self.assertIs(self.memory.best(), self.high)
+        self.assertIs(self.memory.second(), self.middle)
+        self.assertIs(self.memory.worst(), self.low)
+        self.assertTrue(self.memory.is_full())
+
+    def test_older_pair_wins_ties(self):
+        first = _pair(self.time, 0.0, 0.7)
+        second = _pair(self.time, 0.0, 0.7)
+        self.memory.add(first)
+        self.memory.add(second)
+
+        self.assertIs(self.memory.best(), first)
+        self.assertIs(self.memory.worst(), second)
+
+    def test_pop_best(self):
+        self.memory.add(self.low)
+        self.memory.add(self.high)
+
+        self.assertIs(self.memory.pop_best(), self.high)
+        self.assertIs(self.memory.best(), self.low)
+        self.assertEqual(len(self.memory), 1)
+
+    def test_replace_best(self):
+        self.memory.replace_best(self.middle)
+        self.assertIs(self.memory.best(), self.middle)
+
+        self.memory.add(self.low)
+        self.memory.replace_best(self.high)
+
+        self.assertEqual(len(self.memory), 2)
+        self.assertIs(self.memory.best(), self.high)
+        self.assertIs(self.memory.worst(), self.low)
+
+    def test_replace_worst_reorders(self):
+        for pair in (self.low, self.middle, self.high):
+            self.memory.add(pair)
+        better = _pair(self.time, 0.0, 0.9)
+
+        self.memory.replace_worst(better)
+
+        self.assertEqual(len(self.memory), 3)
+        self.assertIs(self.memory.best(), better)
+        self.assertIs(self.memory.worst(), self.middle)
+
+    def test_full_memory_rejects_add(self):
+        for pair in (self.low, self.middle, self.high):
+            self.memory.add(pair)
+
+        with self.assertRaises(Exception):
+            self.memory.add(_pair(self.time, 0.0, 0.9))
+
+    def test_capacity_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            Memory(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from purify.my_enums import Event
+from purify.my_time import Time
+
+
+def _ignore(_):
+    pass
+
+
+class TimeTest(unittest.TestCase):
+    def test_pop_returns_events_in_time_order(self):
+        time = Time()
+        for delay in (3.0, 1.0, 2.0):
+            time.schedule(delay, Event.REQUEST_ARRIVAL, _ignore, delay)
+
+        self.assertEqual([time.pop().data for _ in range(3)], [1.0, 2.0, 3.0])
+        self.assertIsNone(time.pop())
+
+    def test_ties_are_ordered_by_scheduling(self):
+        time = Time()
+        time.schedule_at(1.0, Event.REQUEST_ARRIVAL, _ignore, "first")
+        time.schedule_at(1.0, Event.ENTANGLEMENT_GENERATION, _ignore, "second")
+        time.schedule_at(1.0, Event.REQUEST_ARRIVAL, _ignore, "third")
+
+        self.assertEqual(
+            [time.pop().data for _ in range(3)], ["first", "second", "third"]
+        )
+
+    def test_pop_advances_the_clock(self):
+        time = Time()
+        time.schedule(0.5, Event.ENTANGLEMENT_GENERATION, _ignore)
+        scheduled = time.pop()
+
+        self.assertEqual(time.get_current_time(), 0.5)
+        self.assertIs(time.current_event, scheduled)
+        self.assertEqual(time.last_event(), Event.ENTANGLEMENT_GENERATION)
+
+    def test_schedule_is_relative_to_the_clock(self):
+        time = Time()
+        time.schedule(1.0, Event.REQUEST_ARRIVAL, _ignore)
+        time.pop()
+        scheduled = time.schedule(0.25, Event.REQUEST_ARRIVAL, _ignore)
+
+        self.assertEqual(scheduled.time, 1.25)
+
+    def test_cannot_schedule_in_the_past(self):
+        time = Time()
+        time.schedule(1.0, Event.REQUEST_ARRIVAL, _ignore)
+        time.pop()
+
+        with self.assertRaises(ValueError):
+            time.schedule_at(0.5, Event.REQUEST_ARRIVAL, _ignore)
+
+
+if __name__ == "__main__":
+    unittest.main()
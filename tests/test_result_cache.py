@@ -0,0 +1,125 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from purify.constants_tuple import ConstantsTuple
+from purify.my_enums import LambdaSrategy, Strategy
+from purify.result_cache import ResultCache, cache_key, point_seed
+from purify.sweep import run_sweep
+
+MAX_GENERATIONS = 2000
+
+
+def _constants(strategy: Strategy = Strategy.ALWAYS_REPLACE) -> ConstantsTuple:
+    return ConstantsTuple(strategy, 0.01, 1.0, 1, LambdaSrategy.USE_CONSTANTS)
+
+
+def _cache_files(directory: str) -> list[Path]:
+    return sorted(Path(directory).rglob("*.npz"))
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = ResultCache(directory.name)
+        self.key = cache_key(_constants(), np.random.SeedSequence(1), {})
+
+    def test_round_trip(self):
+        results = [(0.9, 0.0), (0.75, 1e-3)]
+        self.cache.store(self.key, results)
+
+        self.assertEqual(self.cache.load(self.key), results)
+
+    def test_round_trip_without_results(self):
+        self.cache.store(self.key, [])
+
+        self.assertEqual(self.cache.load(self.key), [])
+
+    def test_missing_key(self):
+        self.assertIsNone(self.cache.load(self.key))
+
+    def test_corrupt_entry_is_ignored(self):
+        self.cache.store(self.key, [(0.9, 0.0)])
+        self.cache._path(self.key).write_bytes(b"not an npz file")
+
+        with self.assertLogs("purify.result_cache", level="WARNING"):
+            self.assertIsNone(self.cache.load(self.key))
+
+
+class CacheKeyTest(unittest.TestCase):
+    def test_key_depends_on_seed_options_and_constants(self):
+        seed = np.random.SeedSequence(1)
+        options = {"max_generations": 10}
+        key = cache_key(_constants(), seed, options)
+        prot_1 = _constants(Strategy.ALWAYS_PROT_1)
+
+        self.assertEqual(
+            key, cache_key(_constants(), np.random.SeedSequence(1), dict(options))
+        )
+        self.assertNotEqual(
+            key, cache_key(_constants(), np.random.SeedSequence(2), options)
+        )
+        self.assertNotEqual(
+            key, cache_key(_constants(), seed, {"max_generations": 20})
+        )
+        self.assertNotEqual(key, cache_key(prot_1, seed, options))
+
+    def test_point_seed_depends_on_content_only(self):
+        seed = point_seed(np.random.SeedSequence(1), _constants())
+        same = point_seed(np.random.SeedSequence(1), _constants())
+        other = point_seed(
+            np.random.SeedSequence(1), _constants(Strategy.ALWAYS_PROT_1)
+        )
+
+        self.assertEqual(seed.spawn_key, same.spawn_key)
+        self.assertNotEqual(seed.spawn_key, other.spawn_key)
+
+
+class SweepCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.constants_list = [_constants(), _constants(Strategy.ALWAYS_PROT_1)]
+
+    def _run(self, seed: int | None) -> list[tuple[float, float, ConstantsTuple]]:
+        rows: list[tuple[float, float, ConstantsTuple]] = []
+        run_sweep(
+            self.constants_list,
+            workers=1,
+            seed=seed,
+            write_result=lambda fidelity, time, constants: rows.append(
+                (fidelity, time, constants)
+            ),
+            cache_dir=self.directory,
+            max_generations=MAX_GENERATIONS,
+        )
+        return rows
+
+    def test_cache_disabled_without_seed(self):
+        with self.assertLogs("purify.sweep", level="WARNING") as logs:
+            rows = self._run(seed=None)
+
+        self.assertTrue(rows)
+        self.assertEqual(_cache_files(self.directory), [])
+        self.assertIn("Result cache disabled", "\n".join(logs.output))
+
+    def test_second_run_is_served_from_cache(self):
+        first = self._run(seed=7)
+        self.assertEqual(len(_cache_files(self.directory)), len(self.constants_list))
+
+        # ein zweiter Lauf darf nichts mehr simulieren
+        with mock.patch(
+            "purify.sweep.run_constants", side_effect=AssertionError("simulated")
+        ):
+            second = self._run(seed=7)
+
+        self.assertEqual(second, first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import math
+import unittest
+
+import numpy as np
+
+from purify.statistics import Histogram, RunningStatistics
+
+
+def _running(values) -> RunningStatistics:
+    statistics = RunningStatistics()
+    for value in values:
+        statistics.add(float(value))
+    return statistics
+
+
+class RunningStatisticsTest(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(0).normal(3.0, 2.0, 1000)
+
+    def test_add_matches_numpy(self):
+        statistics = _running(self.values)
+
+        self.assertEqual(statistics.count, 1000)
+        self.assertAlmostEqual(statistics.mean, self.values.mean())
+        self.assertAlmostEqual(statistics.variance, self.values.var(ddof=1))
+        self.assertAlmostEqual(
+            statistics.standard_error, math.sqrt(self.values.var(ddof=1) / 1000)
+        )
+
+    def test_merge_equals_adding_everything(self):
+        merged = _running(self.values[:300])
+        merged.merge(_running(self.values[300:]))
+        expected = _running(self.values)
+
+        self.assertEqual(merged.count, expected.count)
+        self.assertAlmostEqual(merged.mean, expected.mean)
+        self.assertAlmostEqual(merged.variance, expected.variance)
+
+    def test_merge_with_empty(self):
+        statistics = _running(self.values)
+        statistics.merge(RunningStatistics())
+        self.assertEqual(statistics.count, 1000)
+
+        empty = RunningStatistics()
+        empty.merge(_running(self.values))
+        self.assertAlmostEqual(empty.mean, self.values.mean())
+        self.assertAlmostEqual(empty.variance, self.values.var(ddof=1))
+
+    def test_variance_is_nan_with_fewer_than_two_values(self):
+        self.assertTrue(math.isnan(RunningStatistics().variance))
+        self.assertTrue(math.isnan(_running([1.0]).variance))
+        self.assertTrue(math.isnan(_running([1.0]).standard_error))
+
+
+class HistogramTest(unittest.TestCase):
+    def test_merge_sums_counts(self):
+        first = Histogram(0.0, 1.0, 10)
+        second = Histogram(0.0, 1.0, 10)
+        for value in (0.05, 0.5, 1.0):
+            first.add(value)
+        for value in (0.5, 2.0):
+            second.add(value)
+
+        first.merge(second)
+
+        self.assertEqual(first.counts.sum(), 5)
+        self.assertEqual(first.counts[6], 2)
+        # der obere Rand gehört zum letzten Bin, größere Werte zum Überlauf
+        self.assertEqual(first.counts[10], 1)
+        self.assertEqual(first.counts[11], 1)
+
+    def test_merge_rejects_different_bins(self):
+        with self.assertRaises(ValueError):
+            Histogram(0.0, 1.0, 10).merge(Histogram(0.0, 1.0, 20))
+        with self.assertRaises(ValueError):
+            Histogram(1e-3, 1.0, 10).merge(Histogram(1e-3, 1.0, 10, log=True))
+
+    def test_quantile_of_uniform_values(self):
+        histogram = Histogram(0.0, 1.0, 1000)
+        for value in np.random.default_rng(0).uniform(0.0, 1.0, 100_000):
+            histogram.add(value)
+
+        for q in (0.01, 0.5, 0.99):
+            self.assertAlmostEqual(histogram.quantile(q), q, delta=0.01)
+
+    def test_quantile_of_empty_histogram_is_nan(self):
+        self.assertTrue(math.isnan(Histogram(0.0, 1.0, 10).quantile(0.5)))
+
+    def test_log_histogram_keeps_zero_in_underflow(self):
+        histogram = Histogram(1e-9, 1e3, 240, log=True)
+        for value in (0.0, 0.0, 0.0, 1.0):
+            histogram.add(value)
+
+        self.assertEqual(histogram.counts[0], 3)
+        self.assertEqual(histogram.quantile(0.5), 0.0)
+        self.assertAlmostEqual(histogram.quantile(1.0), 1.0, delta=0.15)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import math
+import unittest
+
+import numpy as np
+
+from purify.constants_tuple import ConstantsTuple
+from purify.my_enums import LambdaSrategy, Strategy
+from purify.timeline import Timeline
+from purify.variance_reduction import (
+    _replica_fidelity,
+    _replica_seeds,
+    estimate_fidelity,
+)
+
+CONSTANTS = ConstantsTuple(
+    Strategy.ALWAYS_REPLACE, 0.001, 1.0, 1, LambdaSrategy.USE_CONSTANTS
+)
+GENERATION_COUNT = 20_000
+PAIRS = 80
+
+
+def _pair_fidelities(antithetic: bool) -> np.ndarray:
+    """Fidelity beider Replikate für PAIRS Paare, Form (PAIRS, 2)."""
+    return np.array(
+        [
+            [
+                _replica_fidelity(
+                    CONSTANTS,
+                    Timeline(timeline_seed, GENERATION_COUNT, antithetic=mirrored),
+                    decision_seed,
+                    mirrored,
+                )
+                for timeline_seed, decision_seed, mirrored in _replica_seeds(
+                    pair_seed, antithetic
+                )
+            ]
+            for pair_seed in np.random.SeedSequence(1).spawn(PAIRS)
+        ]
+    )
+
+
+class ReplicaSeedsTest(unittest.TestCase):
+    def test_antithetic_replicas_share_seeds_and_mirror(self):
+        first, second = _replica_seeds(np.random.SeedSequence(0), True)
+        self.assertEqual(first[:2], second[:2])
+        self.assertEqual((first[2], second[2]), (False, True))
+
+    def test_plain_replicas_are_independent(self):
+        first, second = _replica_seeds(np.random.SeedSequence(0), False)
+        self.assertNotEqual(first[0].spawn_key, second[0].spawn_key)
+        self.assertNotEqual(first[1].spawn_key, second[1].spawn_key)
+        self.assertEqual((first[2], second[2]), (False, False))
+
+    def test_plain_replicas_are_not_correlated(self):
+        fidelities = _pair_fidelities(antithetic=False)
+        correlation = np.corrcoef(fidelities[:, 0], fidelities[:, 1])[0, 1]
+        # Standardfehler einer Korrelation von 0 bei 80 Paaren ist etwa 0.11
+        self.assertLess(abs(correlation), 0.35)
+
+    def test_plain_estimate_counts_every_replica(self):
+        estimate = estimate_fidelity(
+            CONSTANTS,
+            pairs=4,
+            generation_count=GENERATION_COUNT,
+            seed=0,
+            antithetic=False,
+        )
+        self.assertEqual(estimate.replicas, 8)
+        self.assertEqual(estimate.generation_attempts, 8 * GENERATION_COUNT)
+
+
+class ControlVariateTest(unittest.TestCase):
+    def test_rejects_always_replace_as_target(self):
+        # der Schätzer wäre nur der Wert des Solvers mit Varianz 0
+        with self.assertRaises(ValueError):
+            estimate_fidelity(
+                CONSTANTS,
+                pairs=2,
+                generation_count=GENERATION_COUNT,
+                seed=0,
+                control_variate=True,
+            )
+
+    def test_pumping_target_reports_finite_speedup(self):
+        estimate = estimate_fidelity(
+            CONSTANTS._replace(strategy=Strategy.ALWAYS_PROT_1),
+            pairs=4,
+            generation_count=GENERATION_COUNT,
+            seed=0,
+            control_variate=True,
+        )
+        self.assertGreater(estimate.fidelity_half_width, 0.0)
+        self.assertTrue(math.isfinite(estimate.speedup))
+        # Ziel und Kontrollvariable laufen je Replikat
+        self.assertEqual(estimate.generation_attempts, 16 * GENERATION_COUNT)
+
+
+if __name__ == "__main__":
+    unittest.main()